@@ -2,90 +2,81 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import StrMethodFormatter
 from io import BytesIO
 
+from utils.assets import inject_page_style
+from utils.charts import animated_choropleth, timeseries_figure
+from utils.datasets import load_defence_budget
+from utils.forecast import MODELS, forecast
+from utils.lazy import lazy_import
+from utils.warmup import start_warmup
+from utils.watcher import start_watcher
+
+plt = lazy_import("matplotlib.pyplot")
+
 st.set_page_config(page_title="Defence Budget", layout="wide")
 st.title("🌍 Global Defence Budget Insights")
 st.markdown("Explore patterns and trends in military spending across the globe via the tabs below.")
 st.divider()
 
 # ─── INJECT GLOBAL CSS ─────────────────────────────────────────────────────────
-st.markdown(
-    """
-    <style>
-    /* Full-screen war-scene background */
-    .stApp {
-      background: url('https://t4.ftcdn.net/jpg/03/49/86/71/240_F_349867133_a2Upqgg99LIDvsGbR4Of3a0bXCwqzrAQ.jpg')
-                  no-repeat center center fixed;
-      background-size: cover;
-    }
-    /* Translucent sidebar */
-    [data-testid="stSidebar"] {
-      background-color: rgba(0, 0, 0, 0.6);
-    }
-    /* Centered hero text */
-    .css-1lcbmhc {
-      text-align: center !important;
-      padding: 1rem !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-@st.cache_data
-def load_data():
-    """Load and validate defence-budget CSV."""
-    df = pd.read_csv("data/Cleaned_Defence_Budget.csv")
-    years = [str(y) for y in range(1960, 2021)]
-    # Essential columns
-    if "Country Code" not in df.columns or "Country Name" not in df.columns:
-        st.error("Dataset must include 'Country Code' and 'Country Name'.")
-        st.stop()
-    # Check for missing year columns
-    missing = [y for y in years if y not in df.columns]
-    if missing:
-        st.warning(f"Missing year columns: {', '.join(missing)}")
-    # Coerce numeric
-    for y in years:
-        if y in df.columns:
-            df[y] = pd.to_numeric(df[y], errors="coerce")
-    return df, years
-
-df, year_columns = load_data()
+inject_page_style()
+start_warmup()
+start_watcher()
+
+df, year_columns = load_defence_budget()
 
 # Create the three horizontal tabs
-tab1, tab2, tab3 = st.tabs([
+tab1, tab2, tab3, tab4 = st.tabs([
     "🌐 Global Spending (% of GDP)",
     "📊 Top Spenders vs India",
-    "🕰️ Decade Breakdown"
+    "🕰️ Decade Breakdown",
+    "🔮 Forecasts"
 ])
 
 # --- Tab 1: Global Military Spending Choropleth Globe ---
 with tab1:
     st.header("🌐 Global Military Spending (% of GDP)")
     years_int = sorted([int(y) for y in year_columns if y.isdigit()])
-    year = st.slider("Select Year", min_value=years_int[0], max_value=years_int[-1], value=years_int[-1])
+    # Scrub mode sends every year once and lets the browser switch frames
+    scrub = st.toggle("Scrub all years in the browser", key="tab1_scrub")
+    if scrub:
+        year = years_int[-1]
+    else:
+        year = st.slider("Select Year", min_value=years_int[0], max_value=years_int[-1], value=years_int[-1])
     ystr = str(year)
     df_year = df[["Country Name", "Country Code", ystr]].dropna(subset=[ystr])
 
     if df_year.empty:
         st.warning("No data for that year.")
     else:
-        fig = px.choropleth(
-            df_year,
-            locations="Country Code",
-            color=ystr,
-            hover_name="Country Name",
-            hover_data={ystr: ':.2f%'},  # Format value nicely
-            projection="orthographic",
-            color_continuous_scale=px.colors.sequential.Blues,
-            range_color=(0, df_year[ystr].quantile(0.95)),
-            title=f"Defence Spending as % of GDP in {year}",
-            labels={ystr: "%GDP"}  # <-- 🛠️ This line fixes your label!
-        )
+        if scrub:
+            fig = animated_choropleth(
+                df[["Country Name", "Country Code", *year_columns]],
+                locations="Country Code",
+                hover_name="Country Name",
+                years=year_columns,
+                value_name="%GDP",
+                upper_quantile=0.95,
+                floor=0,
+                hover_data={"%GDP": ':.2f%'},
+                projection="orthographic",
+                color_continuous_scale=px.colors.sequential.Blues,
+                title="Defence Spending as % of GDP",
+            )
+        else:
+            fig = px.choropleth(
+                df_year,
+                locations="Country Code",
+                color=ystr,
+                hover_name="Country Name",
+                hover_data={ystr: ':.2f%'},  # Format value nicely
+                projection="orthographic",
+                color_continuous_scale=px.colors.sequential.Blues,
+                range_color=(0, df_year[ystr].quantile(0.95)),
+                title=f"Defence Spending as % of GDP in {year}",
+                labels={ystr: "%GDP"}  # <-- 🛠️ This line fixes your label!
+            )
 
         # Update layout
         fig.update_layout(
@@ -285,60 +276,109 @@ with tab3:
 
     st.subheader("🌀 Year-wise Defense Spending (Radial Bar View)")
 
-    col_center = st.columns([1, 4, 1])
-    with col_center[1]:
-        angles = np.linspace(0, 2 * np.pi, len(trend), endpoint=False)
-        radii = trend["Spending"].values
-        labels = trend["Year"].astype(str).tolist()
+    # Every tab runs on each rerun: only import matplotlib once the chart is asked for
+    if st.toggle("Draw the radial chart", key="tab3_radial"):
+        col_center = st.columns([1, 4, 1])
+        with col_center[1]:
+            angles = np.linspace(0, 2 * np.pi, len(trend), endpoint=False)
+            radii = trend["Spending"].values
+            labels = trend["Year"].astype(str).tolist()
 
-        fig_r, ax = plt.subplots(figsize=(7, 7), subplot_kw=dict(polar=True))
+            fig_r, ax = plt.subplots(figsize=(7, 7), subplot_kw=dict(polar=True))
 
-        norm = plt.Normalize(radii.min(), radii.max())
-        colors = plt.cm.viridis(norm(radii))
+            norm = plt.Normalize(radii.min(), radii.max())
+            colors = plt.cm.viridis(norm(radii))
 
-        bars = ax.bar(angles, radii, width=2*np.pi/len(angles), bottom=0.0,
-                      color=colors, edgecolor="black")
+            bars = ax.bar(angles, radii, width=2*np.pi/len(angles), bottom=0.0,
+                          color=colors, edgecolor="black")
 
-        ax.set_xticks([])
-        ax.set_yticklabels([])
+            ax.set_xticks([])
+            ax.set_yticklabels([])
 
-        # Place year labels slightly outside the bar
-        for angle, label in zip(angles, labels):
-            ax.plot([angle, angle], [0, max(radii) + 1], color="gray", linewidth=0.5, linestyle="--")
+            # Place year labels slightly outside the bar
+            for angle, label in zip(angles, labels):
+                ax.plot([angle, angle], [0, max(radii) + 1], color="gray", linewidth=0.5, linestyle="--")
 
-            rotation = np.degrees(angle)
-            alignment = 'left'
-            if 90 < rotation < 270:
-                rotation += 180
-                alignment = 'right'
+                rotation = np.degrees(angle)
+                alignment = 'left'
+                if 90 < rotation < 270:
+                    rotation += 180
+                    alignment = 'right'
 
-            ax.text(angle, max(radii) + 1.5, label,
-                    rotation=rotation,
-                    ha=alignment,
-                    va='center',
-                    fontsize=9,
-                    rotation_mode='anchor')
+                ax.text(angle, max(radii) + 1.5, label,
+                        rotation=rotation,
+                        ha=alignment,
+                        va='center',
+                        fontsize=9,
+                        rotation_mode='anchor')
 
-        # Colorbar
-        sm = plt.cm.ScalarMappable(cmap="viridis", norm=norm)
-        sm.set_array([])
-        cbar = fig_r.colorbar(sm, ax=ax, pad=0.15, fraction=0.035, shrink=0.6)
-        cbar.ax.set_title('% of GDP', fontsize=10, pad=10)
+            # Colorbar
+            sm = plt.cm.ScalarMappable(cmap="viridis", norm=norm)
+            sm.set_array([])
+            cbar = fig_r.colorbar(sm, ax=ax, pad=0.15, fraction=0.035, shrink=0.6)
+            cbar.ax.set_title('% of GDP', fontsize=10, pad=10)
 
-        fig_r.tight_layout()
+            fig_r.tight_layout()
 
-        buf = BytesIO()
-        plt.savefig(buf, format="png", bbox_inches="tight")
-        st.image(buf)
-        plt.close()
+            buf = BytesIO()
+            plt.savefig(buf, format="png", bbox_inches="tight")
+            st.image(buf)
+            plt.close()
 
     st.markdown("---")
 
-
-
-
-
-
-
-
-
+# --- Tab 4: Forecasts ---
+with tab4:
+    st.header("🔮 Defence Spending Forecasts")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        fc_model = st.selectbox(
+            "Model", MODELS, index=MODELS.index("damped"),
+            format_func={"linear": "Linear trend", "ses": "Exponential smoothing",
+                         "damped": "Damped trend", "ar": "AR(2)"}.get,
+        )
+    with col2:
+        fc_horizon = st.slider("Years ahead", 1, 20, 10)
+    with col3:
+        fc_level = st.select_slider("Interval", options=[0.8, 0.9, 0.95], value=0.95, format_func="{:.0%}".format)
+
+    # One batched fit serves every country; selection only filters it
+    fc = forecast("budget", fc_model, fc_horizon, fc_level)
+    fc_countries = st.multiselect(
+        "Countries", sorted(fc["country"].unique()),
+        default=["India", "China", "United States", "Russian Federation"], max_selections=8,
+    )
+    if fc_countries:
+        hist = (
+            df[df["Country Name"].isin(fc_countries)]
+            .melt(id_vars="Country Name", value_vars=year_columns, var_name="Year", value_name="% GDP")
+            .astype({"Year": int})
+        )
+        fig_fc = timeseries_figure(
+            hist, x="Year", y="% GDP", series="Country Name",
+            hovertemplate="%{customdata}<br>%{x}: %{y:.2f}%<extra></extra>",
+        )
+        colors = {}
+        for i, trace in enumerate(fig_fc.data):
+            trace.line.color = colors[trace.name] = px.colors.qualitative.Plotly[i % 10]
+        for country, part in fc[fc["country"].isin(fc_countries)].groupby("country", sort=False):
+            color = colors.get(country)
+            fig_fc.add_scatter(
+                x=np.concatenate([part["year"], part["year"][::-1]]),
+                y=np.concatenate([part["upper"], part["lower"][::-1]]),
+                fill="toself", fillcolor=color, opacity=0.15, line=dict(width=0),
+                hoverinfo="skip", showlegend=False,
+            )
+            fig_fc.add_scatter(
+                x=part["year"], y=part["mean"], mode="lines", line=dict(color=color, dash="dash"),
+                name=f"{country} (forecast)", customdata=part[["lower", "upper"]],
+                hovertemplate=f"{country}<br>%{{x}}: %{{y:.2f}}% (%{{customdata[0]:.2f}}–%{{customdata[1]:.2f}})<extra></extra>",
+            )
+        fig_fc.update_layout(xaxis_title="Year", yaxis_title="% of GDP", legend_title="")
+        st.plotly_chart(fig_fc, use_container_width=True)
+
+    last_year = fc["year"].max()
+    st.subheader(f"Highest forecast spenders in {last_year}")
+    top_fc = fc[fc["year"] == last_year].nlargest(10, "mean").set_index("country")[["mean", "lower", "upper"]]
+    top_fc.columns = ["Forecast (% GDP)", "Lower", "Upper"]
+    st.dataframe(top_fc, use_container_width=True)
@@ -1,47 +1,36 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import numpy as np
 
+from utils.assets import inject_page_style
+from utils.clusters import K_RANGE, best_k, load_clusters
+from utils.datasets import load_military_data
+from utils.power_index import IndexBuilder, load_strength_matrix
+from utils.predictions import METRICS
+from utils.profiles import load_profiles
+from utils.similarity import load_similarity_index
+from utils.warmup import start_warmup
+from utils.watcher import start_watcher
+
 # ─── PAGE CONFIG ───────────────────────────────────────────────────────────────
 st.set_page_config(page_title="🌍 Military Dashboard", layout="wide")
 
 # ─── INJECT GLOBAL CSS ─────────────────────────────────────────────────────────
-st.markdown(
-    """
-    <style>
-    /* Full-screen war-scene background */
-    .stApp {
-      background: url('https://t4.ftcdn.net/jpg/03/49/86/71/240_F_349867133_a2Upqgg99LIDvsGbR4Of3a0bXCwqzrAQ.jpg')
-                  no-repeat center center fixed;
-      background-size: cover;
-    }
-    /* Translucent sidebar */
-    [data-testid="stSidebar"] {
-      background-color: rgba(0, 0, 0, 0.6);
-    }
-    /* Centered hero text */
-    .css-1lcbmhc {
-      text-align: center !important;
-      padding: 1rem !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+inject_page_style()
+start_warmup()
+start_watcher()
 # ─── DATA LOAD ─────────────────────────────────────────────────────────────────
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/military_data.csv")
-    return df
-
-df = load_data()
+df = load_military_data()
 numeric_cols = df.select_dtypes(include='number').columns.tolist()
 country_list = df['country'].unique().tolist()
 
+# Materialized cross-dataset view: one row per ISO3, built offline
+profiles, profile_meta = load_profiles()
+profile_options = profiles.index[profiles['Active Personnel'].notna()].tolist()
+profile_names = profiles['country'].to_dict()
+
 # ─── HEADER ─────────────────────────────────────────────────────────────────────
 st.markdown(
     "<h1 style='text-align: center; color: #2E8B57;'>🌏 Global Military Power Visualization</h1>",
@@ -54,19 +43,23 @@ tabs = st.tabs([
     "📺 Choropleth Map",
     "📊 Compare Countries",
     "🏆 Top-N Ranking Tool",
-    "🧠 Correlation Explorer"
+    "🧠 Correlation Explorer",
+    "🧭 Similar Countries",
+    "🧩 Country Clusters",
+    "⚖️ Power Index Builder"
 ])
 
 # ─── MODULE 1: Country Profile Explorer ─────────────────────────────────────────
 with tabs[0]:
     st.header("🔍 Country Profile Explorer")
 
-    country = st.selectbox(
+    iso3 = st.selectbox(
         "Select a country:",
-        sorted(df['country'].unique()),
-        index=sorted(df['country'].unique()).index('India')
+        profile_options,
+        index=profile_options.index('IND'),
+        format_func=profile_names.get
     )
-    row = df[df['country'] == country].iloc[0]
+    row = profiles.loc[iso3]
 
     st.markdown("### 📌 General Information")
     col1, col2 = st.columns(2)
@@ -121,6 +114,46 @@ with tabs[0]:
             unsafe_allow_html=True
         )
 
+    st.markdown("### 🌐 Cross-Dataset Profile")
+    col5, col6, col7 = st.columns(3)
+    with col5:
+        st.metric("GFP Rank (2024)", "—" if pd.isna(row['GFP Rank']) else f"#{int(row['GFP Rank'])}")
+        st.metric("PowerIndex (2024)", "—" if pd.isna(row['GFP PowerIndex']) else f"{row['GFP PowerIndex']:.4f}")
+    with col6:
+        if pd.notna(row['budget_gdp_latest']):
+            st.metric(f"Defence Budget %GDP ({int(row['budget_gdp_latest_year'])})",
+                      f"{row['budget_gdp_latest']:.2f}%",
+                      f"{row['budget_gdp_latest'] - row['budget_gdp_avg_10y']:+.2f} vs 10y avg")
+        if pd.notna(row['expenditure_usd_latest']):
+            st.metric(f"Military Expenditure ({int(row['expenditure_usd_latest_year'])})",
+                      f"${row['expenditure_usd_latest'] / 1e9:,.2f} B")
+    with col7:
+        if pd.notna(row['india_trade_latest']):
+            st.metric(f"Trade with India (FY {int(row['india_trade_latest_fy'])})",
+                      f"${row['india_trade_latest']:,.0f} M",
+                      f"balance {row['india_trade_balance_total']:,.0f} M all years")
+        if pd.notna(row['companies_latest']):
+            st.metric(f"Top Defence Companies ({int(row['companies_latest_year'])})",
+                      int(row['companies_latest']),
+                      f"${row['company_defense_revenue_latest']:,.0f} M revenue")
+
+    history = pd.DataFrame({
+        "Defence Budget (%GDP)": pd.Series(row['budget_gdp_history'], index=profile_meta['budget_years']),
+        "Military Expenditure (B USD)": pd.Series(row['expenditure_usd_history'], index=profile_meta['expenditure_years']) / 1e9,
+    }) if isinstance(row['budget_gdp_history'], np.ndarray) and isinstance(row['expenditure_usd_history'], np.ndarray) else None
+    if history is not None:
+        hist_fig = go.Figure()
+        hist_fig.add_trace(go.Scatter(x=history.index, y=history["Military Expenditure (B USD)"],
+                                      name="Expenditure (B USD)", line=dict(color="#FFC107")))
+        hist_fig.add_trace(go.Scatter(x=history.index, y=history["Defence Budget (%GDP)"],
+                                      name="Budget (%GDP)", yaxis="y2", line=dict(color="#4CAF50")))
+        hist_fig.update_layout(
+            template="plotly_dark", height=350, title=f"{row['country']}: Spending History",
+            yaxis=dict(title="B USD"), yaxis2=dict(title="% of GDP", overlaying="y", side="right"),
+            legend=dict(orientation="h")
+        )
+        st.plotly_chart(hist_fig, use_container_width=True)
+
 # ─── MODULE 2: Choropleth Map ───────────────────────────────────────────────────
 with tabs[1]:
     st.subheader("📺 Global Metric Choropleth Map")
@@ -140,7 +173,17 @@ with tabs[1]:
 # ─── MODULE 3: Compare Countries ────────────────────────────────────────────────
 with tabs[2]:
     st.subheader("📊 Compare Countries")
-    countries = st.multiselect("Select Countries", country_list, default=country_list[:5])
+    default = country_list[:5]
+    # The similarity index (and scikit-learn) only loads once a peer group is asked for
+    if st.toggle("Start from a country's peer group", key="compare_peers"):
+        anchor = st.selectbox(
+            "Start from the peer group of",
+            country_list,
+            index=country_list.index('India') if 'India' in country_list else 0,
+            key="compare_anchor"
+        )
+        default = load_similarity_index().peer_group(anchor, k=4)
+    countries = st.multiselect("Select Countries", country_list, default=default)
     metric = st.selectbox("Select Attribute to Compare", numeric_cols, key="compare_metric")
     subset = df[df['country'].isin(countries)]
     fig = px.bar(
@@ -208,3 +251,171 @@ with tabs[4]:
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.warning("Please select at least two attributes to compute the correlation matrix.")
+
+# ─── MODULE 6: Similar Countries ────────────────────────────────────────────────
+with tabs[5]:
+    st.subheader("🧭 Countries Most Like...")
+    # Every tab runs on each rerun: build the index (and import scikit-learn) only on request
+    if st.toggle("Find similar countries", key="similar_enabled"):
+        similarity = load_similarity_index()
+        col1, col2, col3 = st.columns([2, 1, 2])
+        with col1:
+            target = st.selectbox(
+                "Select a country:",
+                country_list,
+                index=country_list.index('India') if 'India' in country_list else 0,
+                key="similar_country"
+            )
+        with col2:
+            k = st.slider("Peers", 3, 15, 5, key="similar_k")
+        with col3:
+            distance = st.radio(
+                "Match on",
+                ["euclidean", "cosine"],
+                format_func={"euclidean": "Size and shape (Euclidean)", "cosine": "Shape only (cosine)"}.get,
+                horizontal=True,
+                key="similar_metric"
+            )
+        peers, contrib = similarity.peers(target, k, distance)
+        st.caption(
+            f"All {len(similarity.columns)} metrics, log-scaled and standardized. "
+            + ("Cells show each metric's share of the distance: the darker, the bigger the gap."
+               if distance == "euclidean" else
+               "Cells show each metric's term of the cosine similarity: positive where both countries "
+               "sit on the same side of the average.")
+        )
+        st.dataframe(
+            peers.rename(columns={"country": "Country", "distance": "Distance", "similarity": "Similarity"}),
+            hide_index=True,
+            use_container_width=True
+        )
+        shown = contrib.abs().mean().nlargest(15).index
+        fig = px.imshow(
+            contrib[shown],
+            color_continuous_scale="Viridis" if distance == "euclidean" else "RdBu",
+            color_continuous_midpoint=None if distance == "euclidean" else 0,
+            aspect="auto",
+            labels=dict(color="Contribution"),
+            template="plotly_dark",
+            title=f"What Drives the Match with {target}"
+        )
+        fig.update_xaxes(tickangle=45)
+        st.plotly_chart(fig, use_container_width=True)
+
+# ─── MODULE 7: Country Clusters ─────────────────────────────────────────────────
+with tabs[6]:
+    st.subheader("🧩 Country Clusters by Strength and Spending")
+    cluster_frames, cluster_meta, cluster_features = load_clusters()
+    scores = cluster_frames["scores"]
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        method = st.radio(
+            "Method",
+            ["kmeans", "hierarchical"],
+            format_func={"kmeans": "k-means", "hierarchical": "Hierarchical (Ward)"}.get,
+            horizontal=True,
+            key="cluster_method"
+        )
+    with col2:
+        k = st.slider("Number of clusters", K_RANGE[0], K_RANGE[-1], best_k(scores, method), key=f"cluster_k_{method}")
+    st.caption(
+        "Seven 2024 strength metrics (log-scaled) plus the mean and trend of defence spending (%GDP) "
+        "over 2011–2020, standardized. Cluster 1 is the strongest group. Precomputed for every k."
+    )
+
+    assigned = cluster_frames["assignments"].assign(Cluster=lambda d: d[f"{method}_{k}"].astype(str))
+    fig = px.choropleth(
+        assigned,
+        locations="country_code",
+        color="Cluster",
+        hover_name="country",
+        category_orders={"Cluster": [str(c) for c in range(1, k + 1)]},
+        color_discrete_sequence=px.colors.qualitative.Bold,
+        projection="natural earth",
+        template="plotly_dark",
+        title=f"{k} Clusters ({'k-means' if method == 'kmeans' else 'hierarchical'})"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    col3, col4 = st.columns(2)
+    with col3:
+        sil = scores.pivot(index="k", columns="method", values="silhouette")
+        fig = px.line(sil, markers=True, template="plotly_dark", title="Silhouette Score by k",
+                      labels={"value": "Silhouette", "method": "Method"})
+        st.plotly_chart(fig, use_container_width=True)
+    with col4:
+        members = assigned.groupby("Cluster")["country"].apply(lambda c: ", ".join(sorted(c)))
+        st.dataframe(members.rename("Countries").reset_index(), hide_index=True, use_container_width=True)
+
+    # plotly's figure factory imports scipy: only draw the dendrogram on request
+    if st.toggle("🌳 Show dendrogram", key="cluster_dendrogram"):
+        import plotly.figure_factory as ff
+
+        linkage = cluster_frames["linkage"].to_numpy()
+        # Cut between the merges that leave k and k - 1 clusters
+        threshold = (linkage[-k, 2] + linkage[-(k - 1), 2]) / 2
+        fig = ff.create_dendrogram(
+            cluster_features[cluster_meta["columns"]].to_numpy(),
+            labels=cluster_features["country"].tolist(),
+            linkagefun=lambda _: linkage,
+            color_threshold=threshold,
+        )
+        fig.update_layout(template="plotly_dark", height=500, title="Ward Linkage of All Countries")
+        fig.update_xaxes(tickangle=90, tickfont=dict(size=8))
+        st.plotly_chart(fig, use_container_width=True)
+
+# ─── MODULE 8: Power Index Builder ──────────────────────────────────────────────
+@st.fragment
+def power_index_builder():
+    matrix = load_strength_matrix()
+    builder = st.session_state.get("power_index_builder")
+    if builder is None or builder.matrix is not matrix:
+        builder = st.session_state["power_index_builder"] = IndexBuilder(matrix)
+
+    label = lambda c: c.replace("_", " ").capitalize()  # noqa: E731
+    chosen = st.multiselect("Metrics in the index", matrix.columns, default=METRICS, format_func=label,
+                            key="power_metrics")
+    weights = {}
+    slider_cols = st.columns(3)
+    for i, metric in enumerate(chosen):
+        with slider_cols[i % 3]:
+            weights[metric] = st.slider(label(metric), 0.0, 5.0, 1.0, 0.1, key=f"power_weight_{metric}")
+    if not any(weights.values()):
+        st.warning("Give at least one metric a positive weight.")
+        return
+    builder.set_weights(weights)
+
+    n = st.slider("Show top N", 5, 30, 15, key="power_top_n")
+    top_df = builder.top(n)
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        fig = px.bar(
+            top_df,
+            x="score",
+            y="country",
+            orientation="h",
+            text_auto=".2f",
+            template="plotly_dark",
+            color_discrete_sequence=['goldenrod'],
+            labels={"score": "Index (weighted mean z-score)", "country": ""},
+            title=f"Top {n} by Your Index"
+        )
+        fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.dataframe(
+            top_df.rename(columns={"rank": "Rank", "country": "Country", "score": "Index", "gfp_rank": "GFP Rank"})
+            [["Rank", "Country", "Index", "GFP Rank"]],
+            hide_index=True,
+            use_container_width=True
+        )
+
+
+with tabs[7]:
+    st.subheader("⚖️ Build Your Own Power Index")
+    st.caption(
+        "A weighted mean of standardized 2024 strength metrics. Equal weights on the default seven metrics "
+        "give the strength score used by the 2047 predictions; moving a slider only updates the scores "
+        "by that metric's column."
+    )
+    power_index_builder()
@@ -1,43 +1,22 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+from utils.assets import inject_page_style
+from utils.datasets import load_companies
+from utils.figures import company_bubbles, company_count_race, company_revenue_race
+from utils.sql import top_companies_by_country
+from utils.warmup import start_warmup
+from utils.watcher import start_watcher
+
 st.set_page_config(page_title="Defense Revenue Insights", layout="wide")
 
 # ─── INJECT GLOBAL CSS ─────────────────────────────────────────────────────────
-st.markdown(
-    """
-    <style>
-    /* Full-screen war-scene background */
-    .stApp {
-      background: url('https://t4.ftcdn.net/jpg/03/49/86/71/240_F_349867133_a2Upqgg99LIDvsGbR4Of3a0bXCwqzrAQ.jpg')
-                  no-repeat center center fixed;
-      background-size: cover;
-    }
-    /* Translucent sidebar */
-    [data-testid="stSidebar"] {
-      background-color: rgba(0, 0, 0, 0.6);
-    }
-    /* Centered hero text */
-    .css-1lcbmhc {
-      text-align: center !important;
-      padding: 1rem !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-@st.cache_data
-def load_data():
-    try:
-        return pd.read_csv("data/updated_defense_companies_2005_2020.csv")
-    except FileNotFoundError:
-        st.error("Data file not found at data/updated_defense_companies_2005_2020.csv")
-        st.stop()
+inject_page_style()
+start_warmup()
+start_watcher()
 
 # Load dataset
-df = load_data()
+df = load_companies()
 all_companies = sorted(df["Company"].unique())
 year_selected = df["Year"].max()
 
@@ -50,63 +29,13 @@ tab1, tab2, tab3, tab4 = st.tabs(["Animations", "Trend", "Sunburst", "Bubble"])
 with tab1:
     st.subheader("🎞️ Animated Top Companies by Defense Revenue (2005–2020)")
     top_n = st.slider("Top N Companies", min_value=5, max_value=30, value=10, key="top_n_anim")
-    # Animated bar chart: top N by revenue each year
-    top_countries_over_time = (
-        df.groupby(["Year", "Country"])["Defense_Revenue_From_A_Year_Ago"]
-        .sum()
-        .reset_index()
-        .sort_values(by=["Year", "Defense_Revenue_From_A_Year_Ago"], ascending=[True, False])
-        .groupby("Year")
-        .apply(lambda x: x.head(top_n))
-        .reset_index(drop=True)
-    )
-    max_revenue = top_countries_over_time["Defense_Revenue_From_A_Year_Ago"].max()
-    fig1 = px.bar(
-        top_countries_over_time,
-        x="Defense_Revenue_From_A_Year_Ago",
-        y="Country",
-        color="Country",
-        animation_frame="Year",
-        orientation="h",
-        title=f"Top {top_n} Countries by Defense Revenue",
-        labels={"Defense_Revenue_From_A_Year_Ago": "Defense Revenue"},
-        height=500
-    )
-    fig1.update_layout(
-        xaxis=dict(range=[0, max_revenue]),
-        yaxis={'categoryorder': 'total ascending'},
-        margin=dict(t=40, l=0, r=0, b=0)
-    )
+    # Animated bar chart: top N by revenue each year (ranked in SQL)
+    fig1 = company_revenue_race(top_n)
     st.plotly_chart(fig1, use_container_width=True)
 
     st.subheader("🎞️ Animated Total Number of Companies by Country (2005–2020)")
     # Animated bar chart: count of companies per country each year
-    company_count = (
-        df.groupby(["Year", "Country"])["Company"]
-        .nunique()
-        .reset_index(name="Count")
-        .sort_values(by=["Year", "Count"], ascending=[True, False])
-        .groupby("Year")
-        .apply(lambda x: x.head(top_n))
-        .reset_index(drop=True)
-    )
-    max_count = company_count["Count"].max()
-    fig2 = px.bar(
-        company_count,
-        x="Count",
-        y="Country",
-        color="Country",
-        animation_frame="Year",
-        orientation="h",
-        title="Total Number of Companies by Country",
-        labels={"Count": "Number of Companies"},
-        height=500
-    )
-    fig2.update_layout(
-        xaxis=dict(range=[0, max_count]),
-        yaxis={'categoryorder': 'total ascending'},
-        margin=dict(t=40, l=0, r=0, b=0)
-    )
+    fig2 = company_count_race(top_n)
     st.plotly_chart(fig2, use_container_width=True)
 
 with tab2:
@@ -154,19 +83,8 @@ with tab3:
             key="sb_companies"
         )
     df_year = df[df["Year"] == year_selected]
-    top_countries_list = (
-        df_year.groupby("Country")["Defense_Revenue_From_A_Year_Ago"].sum()
-        .nlargest(num_countries).index
-    )
-    sb_df = df_year[df_year["Country"].isin(top_countries_list)]
-    sunburst_data = (
-        sb_df.groupby(["Country", "Company"])["Defense_Revenue_From_A_Year_Ago"].sum()
-        .reset_index()
-    )
-    top_entries = (
-        sunburst_data.groupby("Country").apply(
-            lambda x: x.nlargest(num_companies, "Defense_Revenue_From_A_Year_Ago")
-        ).reset_index(drop=True)
+    top_entries = top_companies_by_country(year_selected, num_countries, num_companies).rename(
+        columns={"revenue": "Defense_Revenue_From_A_Year_Ago"}
     )
     top_entries["World"] = "World"
     fig_sun = px.sunburst(
@@ -193,34 +111,7 @@ with tab4:
         5, 30, 15,
         key="bubble_n"
     )
-    anim_df = (
-        df.groupby(["Year","Company","Country"], as_index=False)
-        .agg({
-            "Defense_Revenue_From_A_Year_Ago": "sum",
-            "Total Revenue": "sum",
-            "%of Revenue from Defence": "mean"
-        })
-    )
-    anim_df["rank"] = anim_df.groupby("Year")["Defense_Revenue_From_A_Year_Ago"].rank("dense", ascending=False)
-    anim_df = anim_df[anim_df["rank"] <= top_n_bubble]
-    fig_bubble = px.scatter(
-        anim_df,
-        x="Total Revenue",
-        y="Defense_Revenue_From_A_Year_Ago",
-        animation_frame="Year",
-        animation_group="Company",
-        size="%of Revenue from Defence",
-        color="Country",
-        hover_name="Company",
-        size_max=60,
-        title="Company Evolution Over Time",
-        labels={
-            "Defense_Revenue_From_A_Year_Ago": "Defense Revenue",
-            "Total Revenue": "Total Revenue",
-            "%of Revenue from Defence": "% from Defense"
-        },
-    )
-    fig_bubble.update_layout(margin=dict(t=40, l=0, r=0, b=0))
+    fig_bubble = company_bubbles(top_n_bubble)
     st.plotly_chart(fig_bubble, use_container_width=True)
 
 # Footer
@@ -1,51 +1,28 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from utils.assets import inject_page_style
+from utils.charts import animated_choropleth, timeseries_figure
+from utils.countries import with_iso3
+from utils.datasets import load_expenditure
+from utils.sql import expenditure_totals
+from utils.warmup import start_warmup
+from utils.watcher import start_watcher
+
 # --- App config and title ---
 st.set_page_config(page_title="Military Expenditure Dashboard", layout="wide")
 st.title("🌍 Military Expenditure Visualization (1960–2018)")
 
 # ─── INJECT GLOBAL CSS ─────────────────────────────────────────────────────────
-st.markdown(
-    """
-    <style>
-    /* Full-screen war-scene background */
-    .stApp {
-      background: url('https://t4.ftcdn.net/jpg/03/49/86/71/240_F_349867133_a2Upqgg99LIDvsGbR4Of3a0bXCwqzrAQ.jpg')
-                  no-repeat center center fixed;
-      background-size: cover;
-    }
-    /* Translucent sidebar */
-    [data-testid="stSidebar"] {
-      background-color: rgba(0, 0, 0, 0.6);
-    }
-    /* Centered hero text */
-    .css-1lcbmhc {
-      text-align: center !important;
-      padding: 1rem !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+inject_page_style()
+start_warmup()
+start_watcher()
 
 
 # --- Load and filter data ---
-@st.cache_data
-def load_data():
-    df = pd.read_excel("data/Military_Expenditure_final_rounded.xlsx")
-    df = df[df['Indicator Name'] == 'Military expenditure (current USD)']
-    return df
-
 # Load dataframe
-df = load_data()
-
-# Validate structure
-if df.columns[2] != "Type":
-    st.error("❌ Third column must be 'Type'.")
-    st.stop()
+df = load_expenditure()
 
 df = df[df["Type"] == "Country"]
 if df.empty:
@@ -78,22 +55,22 @@ if countries:
     df_sel = df_sel.loc[year_range[0]:year_range[1]]
 
     st.subheader("📈 Expenditure Over Time")
-    fig = go.Figure()
-    for country in df_sel.columns:
-        fig.add_trace(go.Scatter(
-            x=df_sel.index,
-            y=df_sel[country] / 1e9,
-            mode='lines+markers',
-            name=country,
-            meta=country,
-            marker=dict(size=8, opacity=0),
-            hovertemplate=(
-                "Country: %{meta}<br>"
-                "Year: %{x}<br>"
-                "Exp: %{y:.2f} Billion USD<extra></extra>"
-            ),
-            hoverlabel=dict(bgcolor='black', font_color='white')
-        ))
+    series = df_sel.rename_axis('Year').reset_index().melt(id_vars='Year', var_name='Name', value_name='Value')
+    series['Value'] = series['Value'] / 1e9
+    fig = timeseries_figure(
+        series,
+        x='Year',
+        y='Value',
+        series='Name',
+        mode='lines+markers',
+        marker=dict(size=8, opacity=0),
+        hovertemplate=(
+            "Country: %{customdata}<br>"
+            "Year: %{x}<br>"
+            "Exp: %{y:.2f} Billion USD<extra></extra>"
+        ),
+        hoverlabel=dict(bgcolor='black', font_color='white')
+    )
     fig.update_layout(
         template='plotly_dark',
         hovermode='closest',
@@ -122,12 +99,10 @@ if countries:
 # --- Top/Bottom 5 Analysis on main page ---
 st.subheader("💰 Top/Bottom 5 Spenders")
 range_tb = st.slider("Select range for Top/Bottom analysis:", 1960, 2018, (1960, 2018))
-cols_tb = [str(y) for y in range(range_tb[0], range_tb[1] + 1)]
-sum_df = df[['Name'] + cols_tb].set_index('Name').sum(axis=1)
 
-# Top 5 and Bottom 5
-top5 = sum_df.nlargest(5)
-bot5 = sum_df[sum_df > 0].nsmallest(5)
+# Top 5 and Bottom 5 (summed over the range in SQL)
+top5 = expenditure_totals(range_tb[0], range_tb[1], 5)
+bot5 = expenditure_totals(range_tb[0], range_tb[1], 5, bottom=True)
 
 col1, col2 = st.columns(2)
 with col1:
@@ -155,22 +130,38 @@ with col2:
 
 # --- Global Choropleth on main page ---
 st.subheader("🗺 Global Map View")
-year_map = st.slider("Select map year:", 1960, 2018, 2018)
-map_df = df[['Name', str(year_map)]].rename(columns={str(year_map): 'Value'})
-map_df = map_df[map_df['Value'] > 0]
-fig_map = px.choropleth(
-    map_df,
-    locations='Name',
-    locationmode='country names',
-    color='Value',
-    color_continuous_scale='YlOrRd',
-    projection='orthographic',
-    hover_name='Name',
-    hover_data={'Value': ':.2f'},
-)
-fig_map.update_traces(
-    hovertemplate="Country: %{location}<br>Value: %{z:.2f} USD<extra></extra>",
-    hoverlabel=dict(bgcolor='black', font_color='white')
-)
+map_hover = "Country: %{hovertext}<br>Value: %{z:.2f} USD<extra></extra>"
+# Scrub mode sends every year once and lets the browser switch frames
+if st.toggle("Scrub all years in the browser", key="map_scrub"):
+    all_years = with_iso3(df[['Name', *years_all]], 'Name')
+    all_years = all_years[all_years['iso3'].notna()]
+    all_years[years_all] = all_years[years_all].where(all_years[years_all] > 0)
+    fig_map = animated_choropleth(
+        all_years,
+        locations='iso3',
+        hover_name='Name',
+        years=years_all,
+        hovertemplate=map_hover,
+        color_continuous_scale='YlOrRd',
+        projection='orthographic',
+    )
+    fig_map.update_traces(hoverlabel=dict(bgcolor='black', font_color='white'))
+else:
+    year_map = st.slider("Select map year:", 1960, 2018, 2018)
+    map_df = with_iso3(df[['Name', str(year_map)]], 'Name').rename(columns={str(year_map): 'Value'})
+    map_df = map_df[(map_df['Value'] > 0) & map_df['iso3'].notna()]
+    fig_map = px.choropleth(
+        map_df,
+        locations='iso3',
+        color='Value',
+        color_continuous_scale='YlOrRd',
+        projection='orthographic',
+        hover_name='Name',
+        hover_data={'Value': ':.2f'},
+    )
+    fig_map.update_traces(
+        hovertemplate=map_hover,
+        hoverlabel=dict(bgcolor='black', font_color='white')
+    )
 fig_map.update_layout(template='plotly_dark', margin=dict(l=0, r=0, t=30, b=0))
 st.plotly_chart(fig_map, use_container_width=True)
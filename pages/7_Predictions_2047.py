@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-import matplotlib.pyplot as plt
+
+from utils.assets import inject_page_style
+from utils.backtest import HORIZON, load_backtest
+from utils.lazy import lazy_import
+from utils.predictions import load_predictions, model_info
+from utils.simulation import DRAWS, load_simulation
+from utils.warmup import start_warmup
+from utils.watcher import start_watcher
+
+plt = lazy_import("matplotlib.pyplot")
 
 # Page configuration
 st.set_page_config(page_title="Top Military Powers Prediction 2047", layout="wide")
@@ -11,102 +17,18 @@ st.set_page_config(page_title="Top Military Powers Prediction 2047", layout="wid
 st.title("Top Military Powers Prediction for 2047")
 
 # ─── INJECT GLOBAL CSS ─────────────────────────────────────────────────────────
-st.markdown(
-    """
-    <style>
-    /* Full-screen war-scene background */
-    .stApp {
-      background: url('https://t4.ftcdn.net/jpg/03/49/86/71/240_F_349867133_a2Upqgg99LIDvsGbR4Of3a0bXCwqzrAQ.jpg')
-                  no-repeat center center fixed;
-      background-size: cover;
-    }
-    /* Translucent sidebar */
-    [data-testid="stSidebar"] {
-      background-color: rgba(0, 0, 0, 0.6);
-    }
-    /* Centered hero text */
-    .css-1lcbmhc {
-      text-align: center !important;
-      padding: 1rem !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-# Load data
-@st.cache_data
-def load_data():
-    """
-    Load military strength and defense budget datasets.
-    Expects:
-    - 2024_military_strength_by_country.csv
-    - Defence_budget_cleaned.csv
-    """
-    ms = pd.read_csv("data/2024_military_strength_by_country.csv")
-    db = pd.read_csv("data/Cleaned_Defence_Budget.csv")
-    return ms, db
-
-military_strength, defense_budget = load_data()
-
-def create_strength_score(df):
-    """Compute a composite strength score from selected metrics."""
-    metrics = [
-        'total_national_populations',
-        'active_service_military_manpower',
-        'total_military_aircraft_strength',
-        'total_combat_tank_strength',
-        'navy_strength',
-        'national_annual_defense_budgets',
-        'purchasing_power_parities'
-    ]
-    for m in metrics:
-        if m in df.columns:
-            df[m] = pd.to_numeric(df[m], errors='coerce')
-    df_clean = df.dropna(subset=[m for m in metrics if m in df.columns])
-    scaler = StandardScaler()
-    scaled = scaler.fit_transform(df_clean[metrics])
-    sdf = pd.DataFrame(scaled, columns=metrics)
-    sdf['strength_score'] = sdf.mean(axis=1)
-    sdf['country'] = df_clean['country'].values
-    sdf['pwr_index'] = pd.to_numeric(df_clean['pwr_index'], errors='coerce')
-    return sdf.sort_values('strength_score', ascending=False)
-
-
-def analyze_growth_trajectory(strength_df, budget_df):
-    """Estimate budget growth slopes as growth indicators."""
-    growth = []
-    for c in strength_df['country']:
-        subset = budget_df[budget_df['Country Name'] == c]
-        years = [str(y) for y in range(2000, 2021) if str(y) in subset.columns]
-        if subset.empty or len(years) < 5:
-            growth.append(0)
-        else:
-            vals = subset[years].values.flatten().astype(float)
-            idx = np.arange(len(vals))[~np.isnan(vals)].reshape(-1,1)
-            y = vals[~np.isnan(vals)]
-            model = LinearRegression().fit(idx, y)
-            growth.append(model.coef_[0])
-    strength_df['growth_slope'] = growth
-    # normalize
-    gs = strength_df['growth_slope']
-    strength_df['growth_norm'] = (gs - gs.min())/(gs.max()-gs.min() + 1e-9)
-    return strength_df
-
-
-def predict_future(df, target_year=2047):
-    years_proj = target_year - 2024
-    # Projected strength = current + growth impact
-    df['projected_strength'] = df['strength_score'] + df['growth_norm'] * (years_proj/5)
-    # Combine with PWR index
-    df['projection_score'] = df['projected_strength'] - 0.1 * df['pwr_index']
-    return df.sort_values('projection_score', ascending=False)
+inject_page_style()
+start_warmup()
+start_watcher()
 
 # Run predictions
 with st.spinner("Calculating predictions..."):
-    strength = create_strength_score(military_strength)
-    strength = analyze_growth_trajectory(strength, defense_budget)
-    future = predict_future(strength)
+    strength, future = load_predictions()
+info = model_info()
+if info.get("trained_at"):
+    st.caption(f"Model v{info['model_version']} trained {info['trained_at']} (fingerprint {info['fingerprint']}).")
+if info["stale"]:
+    st.warning("The data has changed since this model was trained. Retrain it with `python -m utils.predictions`.")
 
 # Display current vs predicted
 col1, col2 = st.columns(2)
@@ -139,3 +61,42 @@ ax.set_xticks([1,2]);ax.set_xticklabels(['2024','2047']);ax.set_ylim(16,0);ax.se
 ax.legend();st.pyplot(fig)
 
 st.markdown("**Note:** Increased weight to growth slope creates movement in top rankings.")
+
+# ─── UNCERTAINTY ───────────────────────────────────────────────────────────────
+st.subheader("How Certain Is the 2047 Top 10?")
+st.caption(
+    f"{DRAWS:,} simulated rankings, each with budget growth slopes resampled from their "
+    "2000–2020 fit residuals and the strength metrics perturbed by about ±10%."
+)
+with st.spinner("Simulating rankings..."):
+    sim, _ = load_simulation()
+contenders = sim[sim["p_top10"] > 0].head(15)
+st.bar_chart(contenders.set_index("country")["p_top10"].rename("P(top 10)"), horizontal=True, sort=False)
+st.dataframe(
+    contenders.rename(columns={
+        "country": "Country", "rank": "Projected Rank", "median_rank": "Median Rank",
+        "rank_p05": "Best (5%)", "rank_p95": "Worst (95%)", "p_top10": "P(Top 10)",
+    })[["Country", "Projected Rank", "Median Rank", "Best (5%)", "Worst (95%)", "P(Top 10)"]],
+    hide_index=True,
+    column_config={"P(Top 10)": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1)},
+)
+
+# ─── BACKTEST ──────────────────────────────────────────────────────────────────
+st.subheader("How Well Does the Projection Rank? (Backtest)")
+st.caption(
+    f"The same growth-slope projection replayed on defence budget (% of GDP) from each origin year "
+    f"and scored against the levels {HORIZON} years later, next to simply keeping the origin's ranking."
+)
+bt = load_backtest()
+m1, m2 = st.columns(2)
+m1.metric("Mean rank correlation", f"{bt['spearman'].mean():.2f}",
+          f"{bt['spearman'].mean() - bt['persistence_spearman'].mean():+.2f} vs persistence")
+m2.metric("Mean top-10 overlap", f"{bt['top10_overlap'].mean():.0%}",
+          f"{bt['top10_overlap'].mean() - bt['persistence_top10_overlap'].mean():+.0%} vs persistence")
+st.line_chart(
+    bt.set_index("origin")[["spearman", "persistence_spearman", "top10_overlap", "persistence_top10_overlap"]]
+    .rename(columns={
+        "spearman": "Rank correlation", "persistence_spearman": "Rank correlation (persistence)",
+        "top10_overlap": "Top-10 overlap", "persistence_top10_overlap": "Top-10 overlap (persistence)",
+    })
+)
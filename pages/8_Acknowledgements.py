@@ -1,5 +1,9 @@
 import streamlit as st
 
+from utils.assets import inject_page_style
+from utils.warmup import start_warmup
+from utils.watcher import start_watcher
+
 
 st.set_page_config(
     page_title="Acknowledgements",
@@ -9,30 +13,9 @@ st.set_page_config(
 
 st.title("Acknowledgements")
 # Inject custom CSS
-st.markdown(
-    """
-    <style>
-    /* Full-screen app container with centered native-size background */
-    .stApp {
-        background-image: url('https://static.vecteezy.com/system/resources/previews/027/103/278/non_2x/silhouette-soldiers-descend-from-helicopter-warning-of-danger-against-a-sunset-background-with-space-for-text-promoting-peace-and-cessation-of-hostilities-free-photo.jpg');
-        background-attachment: fixed;
-        background-size: cover;
-    }
-    
-    /* Make sidebar slightly translucent so the background peeks through */
-    [data-testid="stSidebar"] {
-        background-color: rgba(0, 0, 0, 0.6);
-    }
-
-    /* Right-aligned hero text */
-    .css-1lcbmhc {  /* you may need to adjust this selector to match your Streamlit version */
-        text-align: center !important;
-        padding: 1rem 1rem !important;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+inject_page_style("home_background")
+start_warmup()
+start_watcher()
 
 st.markdown("""
 """, unsafe_allow_html=False)
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.schema import SchemaError, conform, year_columns
+
+
+def budget_frame():
+    years = year_columns("defence_budget")
+    rows = {"Country Name": ["India", "France", "Chad"], "Country Code": ["IND", "FRA", "TCD"]}
+    rows.update({y: [2.5, 1.9, np.nan] for y in years})
+    return pd.DataFrame(rows)
+
+
+def test_missing_year_column_is_added_empty_and_kept():
+    df, warnings = conform("defence_budget", budget_frame().drop(columns=["1975"]))
+    assert any("1975" in w and "added empty" in w for w in warnings)
+    assert "1975" in df.columns
+    assert df["1975"].isna().all()
+
+
+def test_every_declared_year_survives_even_when_constant():
+    raw = budget_frame()
+    raw["1980"] = 3.0
+    df, _ = conform("defence_budget", raw)
+    assert set(year_columns("defence_budget")) <= set(df.columns)
+
+
+def test_missing_required_column_raises():
+    with pytest.raises(SchemaError, match="Country Code"):
+        conform("defence_budget", budget_frame().drop(columns=["Country Code"]))
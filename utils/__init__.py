@@ -0,0 +1 @@
+"""Shared helpers for the Art of War Streamlit pages."""
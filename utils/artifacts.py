@@ -0,0 +1,154 @@
+"""
+Precomputed artifacts stored under ``artifacts/<name>/``.
+
+An artifact is a set of DataFrames (one Parquet file each) plus a
+``meta.json`` recording the fingerprint it was built under; callers put
+whatever the result depends on into that fingerprint (``utils.pipeline``
+hashes input files, code, upstream artifacts and build parameters). Pages
+load an artifact only if the fingerprint still matches, so editing a data
+file or a parameter transparently triggers a rebuild. A stale artifact is
+rebuilt once even when several sessions or processes notice it at the
+same time (see ``load_or_build``).
+
+Each build is written to its own ``.<name>.v<time>`` directory and
+published by atomically repointing the ``<name>`` symlink at it, so a
+reader sees either the old frames and meta or the new ones, never a mix.
+The previous version is kept for readers still loading it.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+from utils.paths import ARTIFACTS_DIR, ROOT_DIR
+from utils.singleflight import SingleFlight, file_lock, single_flight
+
+_builds = SingleFlight()
+
+
+@lru_cache(maxsize=256)
+@single_flight
+def _digest(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, re-hashed only when its stat changes."""
+    st = os.stat(path)
+    return _digest(str(path), st.st_mtime_ns, st.st_size)
+
+
+def fingerprint(inputs, **params):
+    """Stable hash over input file contents and build parameters."""
+    h = hashlib.sha256()
+    for path in sorted(str(p) for p in inputs):
+        h.update(os.path.relpath(path, ROOT_DIR).encode())
+        h.update(file_digest(path).encode())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:16]
+
+
+def save_artifact(name, frames, fingerprint, **meta):
+    """Atomically replace ``artifacts/<name>`` with the given frames."""
+    ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{name}.build.", dir=ARTIFACTS_DIR)
+    for key, frame in frames.items():
+        frame.to_parquet(os.path.join(tmp, f"{key}.parquet"))
+    with open(os.path.join(tmp, "meta.json"), "w") as fh:
+        json.dump({"fingerprint": fingerprint, "frames": sorted(frames), **meta}, fh, indent=2, default=str)
+    version = f".{name}.v{time.time_ns()}"
+    os.replace(tmp, ARTIFACTS_DIR / version)
+    _publish(name, version)
+
+
+def _publish(name, version):
+    """Point ``artifacts/<name>`` at directory ``version`` in one rename."""
+    target = ARTIFACTS_DIR / name
+    if target.is_dir() and not target.is_symlink():
+        # A plain directory (older layout) cannot be swapped for a link atomically
+        aside = tempfile.mkdtemp(prefix=f".{name}.old.", dir=ARTIFACTS_DIR)
+        os.replace(target, os.path.join(aside, name))
+        shutil.rmtree(aside, ignore_errors=True)
+    previous = os.readlink(target) if target.is_symlink() else None
+    link = ARTIFACTS_DIR / f"{version}.link"
+    try:
+        os.symlink(version, link)
+    except OSError:
+        # No symlinks (e.g. Windows without the privilege): plain directory swap
+        if target.exists():
+            aside = tempfile.mkdtemp(prefix=f".{name}.old.", dir=ARTIFACTS_DIR)
+            os.replace(target, os.path.join(aside, name))
+            shutil.rmtree(aside, ignore_errors=True)
+        os.replace(ARTIFACTS_DIR / version, target)
+        return
+    os.replace(link, target)
+    for old in ARTIFACTS_DIR.glob(f".{name}.v*"):
+        if old.name not in (version, previous) and old.is_dir():
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def read_meta(name):
+    """The artifact's ``meta.json`` contents, or None if it was never built."""
+    path = ARTIFACTS_DIR / name / "meta.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def load_artifact(name, fingerprint=None):
+    """
+    Return ``(frames, meta)`` for a built artifact.
+
+    Returns None when the artifact is missing or, if ``fingerprint`` is
+    given, was built from different inputs.
+    """
+    for attempt in range(2):
+        # Resolve the link once so meta and frames come from the same build
+        root = (ARTIFACTS_DIR / name).resolve()
+        path = root / "meta.json"
+        try:
+            if not path.exists():
+                return None
+            meta = json.loads(path.read_text())
+            if fingerprint is not None and meta["fingerprint"] != fingerprint:
+                return None
+            frames = {key: pd.read_parquet(root / f"{key}.parquet") for key in meta["frames"]}
+            return frames, meta
+        except FileNotFoundError:
+            # Two newer builds were published while reading; read the current one
+            if attempt:
+                raise
+
+
+def load_or_build(name, fingerprint, build):
+    """
+    ``(frames, meta)`` for the artifact built from ``fingerprint``.
+
+    On a miss ``build()`` (which must save the artifact) runs once: callers
+    in this process wait on the same build, other processes wait on the
+    artifact's lock file and then read what the first one wrote.
+    """
+    loaded = load_artifact(name, fingerprint)
+    if loaded is not None:
+        return loaded
+    return _builds.do((name, fingerprint), _build_locked, name, fingerprint, build)
+
+
+def _build_locked(name, fingerprint, build):
+    with file_lock(ARTIFACTS_DIR / f".{name}.lock"):
+        loaded = load_artifact(name, fingerprint)
+        if loaded is None:
+            build()
+            loaded = load_artifact(name, fingerprint)
+    if loaded is None:
+        raise RuntimeError(f"Building artifact {name!r} did not produce fingerprint {fingerprint}")
+    return loaded
@@ -0,0 +1,226 @@
+"""
+Local image asset pipeline.
+
+Source images (remote URLs or files under ``static/originals``) are resized
+into WebP/JPEG variants whose file names carry a content hash, e.g.
+``conflicts/six-day-war-1967.3f2a1b9c04.960w.webp``. A changed image always
+gets a new URL, so browsers and proxies can cache every variant forever.
+
+Build the variants and ``static/manifest.json`` with::
+
+    python -m utils.assets
+
+Pages look assets up by logical name and fall back to the original source
+URL for anything that has not been built yet.
+"""
+import hashlib
+import io
+import json
+import sys
+import urllib.request
+from functools import lru_cache
+
+import streamlit as st
+
+from utils.paths import ROOT_DIR, STATIC_DIR
+
+MANIFEST_PATH = STATIC_DIR / "manifest.json"
+ORIGINALS_DIR = STATIC_DIR / "originals"
+STATIC_URL = "app/static"
+
+BACKGROUND_WIDTHS = (1280, 1920)
+CONFLICT_WIDTHS = (480, 960)
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 6}),
+           "jpg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True})}
+
+# ─── SOURCES ───────────────────────────────────────────────────────────────────
+# logical name -> (source URL or path relative to static/, target widths)
+SOURCES = {
+    "home_background": (
+        "https://static.vecteezy.com/system/resources/previews/027/103/278/non_2x/silhouette-soldiers-descend-from-helicopter-warning-of-danger-against-a-sunset-background-with-space-for-text-promoting-peace-and-cessation-of-hostilities-free-photo.jpg",
+        BACKGROUND_WIDTHS,
+    ),
+    "page_background": (
+        "https://t4.ftcdn.net/jpg/03/49/86/71/240_F_349867133_a2Upqgg99LIDvsGbR4Of3a0bXCwqzrAQ.jpg",
+        BACKGROUND_WIDTHS,
+    ),
+    "conflicts/indo-china-war-1962": (
+        "https://upload.wikimedia.org/wikipedia/commons/b/bc/Indian_soldiers_on_patrol_during_the_1962_Sino-Indian_border_war.jpg",
+        CONFLICT_WIDTHS,
+    ),
+    "conflicts/indo-pakistan-war-1965": (
+        "https://upload.wikimedia.org/wikipedia/commons/thumb/3/30/Pakistani_AMX-13_%281965_War%29.jpg/500px-Pakistani_AMX-13_%281965_War%29.jpg",
+        CONFLICT_WIDTHS,
+    ),
+    "conflicts/six-day-war-1967": ("originals/six-day-war-1967.jpg", CONFLICT_WIDTHS),
+    "conflicts/indo-pakistan-war-1971": (
+        "https://upload.wikimedia.org/wikipedia/commons/thumb/1/16/1971_Instrument_of_Surrender.jpg/500px-1971_Instrument_of_Surrender.jpg",
+        CONFLICT_WIDTHS,
+    ),
+    "conflicts/soviet-afghan-war-1979-1989": (
+        "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcQ5kFt15sfNaSopAutFQqE4HHDzM_3NeVRAPA&s",
+        CONFLICT_WIDTHS,
+    ),
+    "conflicts/kargil-war-1999": (
+        "https://upload.wikimedia.org/wikipedia/commons/6/6d/Kargil_war.jpg",
+        CONFLICT_WIDTHS,
+    ),
+    "conflicts/gulf-war-1990-1991": (
+        "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcQuzpZqrTStm4E5UwZm4uvzRDoZfBHUSIbiuL7w1ylMumVCtmXM7yW9-6XrhePcPQ1aUiU&usqp=CAU",
+        CONFLICT_WIDTHS,
+    ),
+    "conflicts/afghanistan-war-2001-2021": (
+        "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcQFMVoiTM6DIDnTJMyuq2RNddAjIefJhiv4NkroUyHfBU4BE_X_omt6YwMy7NGIDxEIp0c&usqp=CAU",
+        CONFLICT_WIDTHS,
+    ),
+    "conflicts/iraq-war-2003-2011": ("originals/iraq-war-2003-2011.jpg", CONFLICT_WIDTHS),
+}
+
+
+# ─── RUNTIME LOOKUPS ───────────────────────────────────────────────────────────
+@lru_cache(maxsize=1)
+def load_manifest():
+    """Read the built asset manifest (empty if the pipeline has not run)."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def _pick_variant(name, width, fmt):
+    """Smallest built variant at least ``width`` wide, else the largest one."""
+    variants = [v for v in load_manifest().get(name, {}).get("variants", []) if v["format"] == fmt]
+    if not variants:
+        return None
+    variants.sort(key=lambda v: v["width"])
+    for v in variants:
+        if v["width"] >= width:
+            return v
+    return variants[-1]
+
+
+def _fallback(name):
+    source = SOURCES[name][0]
+    return source if source.startswith("http") else str(STATIC_DIR / source)
+
+
+def asset_path(name, width=960, fmt="webp"):
+    """Local file for ``st.image``; falls back to the original source."""
+    v = _pick_variant(name, width, fmt)
+    return str(STATIC_DIR / v["file"]) if v else _fallback(name)
+
+
+def asset_url(name, width=1920, fmt="webp"):
+    """Browser URL served by Streamlit's static file handler."""
+    v = _pick_variant(name, width, fmt)
+    if v:
+        return f"{STATIC_URL}/{v['file']}"
+    source = SOURCES[name][0]
+    return source if source.startswith("http") else f"{STATIC_URL}/{source}"
+
+
+def inject_page_style(background="page_background"):
+    """Inject the shared page CSS with a locally served background image."""
+    st.markdown(
+        f"""
+        <style>
+        /* Full-screen war-scene background */
+        .stApp {{
+          background: url('{asset_url(background)}')
+                      no-repeat center center fixed;
+          background-size: cover;
+        }}
+        /* Translucent sidebar */
+        [data-testid="stSidebar"] {{
+          background-color: rgba(0, 0, 0, 0.6);
+        }}
+        /* Centered hero text */
+        .css-1lcbmhc {{
+          text-align: center !important;
+          padding: 1rem !important;
+        }}
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+# ─── BUILD ─────────────────────────────────────────────────────────────────────
+def _read_source(name, source):
+    """Return the original image bytes, downloading remote sources once."""
+    if not source.startswith("http"):
+        return (STATIC_DIR / source).read_bytes()
+    cached = ORIGINALS_DIR / (name.replace("/", "__") + ".img")
+    if cached.exists():
+        return cached.read_bytes()
+    req = urllib.request.Request(source, headers={"User-Agent": "art-of-war-assets/1.0"})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        data = resp.read()
+    ORIGINALS_DIR.mkdir(parents=True, exist_ok=True)
+    cached.write_bytes(data)
+    return data
+
+
+def build_asset(name, source, widths):
+    """Write hashed variants of one asset and return its manifest entry."""
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(_read_source(name, source)))
+    img = img.convert("RGB")
+    variants = []
+    # Never upscale; an image narrower than every target yields one variant
+    targets = sorted({min(w, img.width) for w in widths})
+    for width in targets:
+        resized = img if width == img.width else img.resize(
+            (width, round(img.height * width / img.width)), Image.LANCZOS
+        )
+        for ext, (pil_format, options) in FORMATS.items():
+            buf = io.BytesIO()
+            resized.save(buf, pil_format, **options)
+            data = buf.getvalue()
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            rel = f"{name}.{digest}.{width}w.{ext}"
+            out = STATIC_DIR / rel
+            out.parent.mkdir(parents=True, exist_ok=True)
+            if not out.exists():
+                out.write_bytes(data)
+            variants.append({"file": rel, "width": width, "format": ext, "bytes": len(data)})
+    return {"source": source, "variants": variants}
+
+
+def _prune(manifest):
+    """Delete variant files that the new manifest no longer references."""
+    keep = {v["file"] for entry in manifest.values() for v in entry["variants"]}
+    for path in STATIC_DIR.rglob("*w.*"):
+        rel = path.relative_to(STATIC_DIR).as_posix()
+        if rel.startswith("originals/") or rel in keep:
+            continue
+        if rel.endswith((".webp", ".jpg")):
+            path.unlink()
+
+
+def build_all():
+    """Build every registered asset; unreachable sources keep their fallback."""
+    manifest = {}
+    for name, (source, widths) in SOURCES.items():
+        try:
+            manifest[name] = build_asset(name, source, widths)
+        except Exception as exc:  # noqa: BLE001 - offline builds must not abort
+            print(f"skip {name}: {exc}", file=sys.stderr)
+            continue
+        sizes = ", ".join(f"{v['width']}w.{v['format']}={v['bytes'] // 1024}KB" for v in manifest[name]["variants"])
+        print(f"built {name}: {sizes}")
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    _prune(manifest)
+    load_manifest.cache_clear()
+    print(f"wrote {MANIFEST_PATH.relative_to(ROOT_DIR)} ({len(manifest)}/{len(SOURCES)} assets)")
+    return manifest
+
+
+if __name__ == "__main__":
+    built = build_all()
+    missing = sorted(set(SOURCES) - set(built))
+    if missing:
+        # Pages would still hot-link these; a deploy must not ship that silently
+        print(f"{len(missing)} assets not built (pages fall back to their remote URL): "
+              f"{', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
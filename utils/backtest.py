@@ -0,0 +1,154 @@
+"""
+Rolling-origin backtest of the 2047 projection logic.
+
+The predictions page ranks countries by a standardized score plus each
+country's budget growth slope, min-max normalised and scaled by the
+horizon (``utils.predictions.predict_future``). The 2024 strength metrics
+have no history, so the backtest replays the same logic on the one series
+that does, the defence budget (% of GDP), for the strength table's
+countries:
+
+- at each origin year, fit every country's slope over the preceding
+  ``LOOKBACK`` years (at least ``MIN_YEARS`` observed, else 0, as on the
+  page), normalise it, and project ``z(level at origin) + growth_norm *
+  horizon / 5``;
+- compare that ranking with the realised levels ``horizon`` years later:
+  Spearman rank correlation and the overlap of the two top-10 lists;
+- report a persistence baseline (the origin's own ranking) alongside.
+
+Origins are independent, so they run in a process pool, and each origin's
+result is kept in the shared disk cache::
+
+    python -m utils.backtest --first 1985 --last 2010 --horizon 10
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.budget import BUDGET_PATH
+from utils.datasets import SCHEMA_SOURCE, STRENGTH_PATH, read_dataset
+from utils.diskcache import disk_cached
+from utils.schema import year_columns
+
+HORIZON = 10
+LOOKBACK = 20
+MIN_YEARS = 5
+TOP_N = 10
+FIRST_ORIGIN, LAST_ORIGIN = 1985, 2010
+MODULE_SOURCE = Path(__file__)
+
+
+def budget_history():
+    """``(countries, years, values)`` of the budget rows matching the strength table."""
+    strength, _ = read_dataset("strength_2024")
+    budget, _ = read_dataset("defence_budget")
+    budget = budget[budget["Country Name"].isin(strength["country"])].drop_duplicates("Country Name")
+    years = [c for c in budget.columns if str(c).isdigit()]
+    return budget["Country Name"].astype(str).to_numpy(), np.array(years, dtype=int), budget[years].to_numpy(float)
+
+
+def trend_slopes(block, min_years=MIN_YEARS):
+    """Least-squares slope per row over its observed columns (0 if too few)."""
+    m = np.isfinite(block)
+    n = m.sum(axis=1)
+    # Position among observed years, as LinearRegression on the page sees it
+    t = np.where(m, np.cumsum(m, axis=1) - 1, 0).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tbar = t.sum(axis=1) / n
+        ybar = np.where(m, block, 0).sum(axis=1) / n
+        dt = np.where(m, t - tbar[:, None], 0)
+        slope = (dt * np.where(m, block - ybar[:, None], 0)).sum(axis=1) / (dt ** 2).sum(axis=1)
+    return np.where((n >= min_years) & np.isfinite(slope), slope, 0.0)
+
+
+def _zscore(values):
+    return (values - np.nanmean(values)) / np.nanstd(values)
+
+
+def _top_overlap(a, b, n=TOP_N):
+    return len(set(a.nlargest(n).index) & set(b.nlargest(n).index)) / n
+
+
+@disk_cached(inputs=[BUDGET_PATH, STRENGTH_PATH, SCHEMA_SOURCE, MODULE_SOURCE])
+def backtest_origin(origin, horizon=HORIZON, lookback=LOOKBACK):
+    """Scores of the projection made at ``origin`` against ``origin + horizon``."""
+    countries, years, values = budget_history()
+    col = {y: i for i, y in enumerate(years)}
+    window = values[:, col[origin - lookback]:col[origin] + 1]
+    slope = trend_slopes(window)
+    growth_norm = (slope - slope.min()) / (slope.max() - slope.min() + 1e-9)
+    base = _zscore(values[:, col[origin]])
+    projected = pd.Series(base + growth_norm * (horizon / 5), index=countries)
+    persistence = pd.Series(base, index=countries)
+    actual = pd.Series(values[:, col[origin + horizon]], index=countries)
+    ok = projected.notna() & actual.notna()
+    projected, persistence, actual = projected[ok], persistence[ok], actual[ok]
+    return {
+        "origin": origin,
+        "target": origin + horizon,
+        "countries": int(ok.sum()),
+        "spearman": projected.corr(actual, method="spearman"),
+        "top10_overlap": _top_overlap(projected, actual),
+        "persistence_spearman": persistence.corr(actual, method="spearman"),
+        "persistence_top10_overlap": _top_overlap(persistence, actual),
+    }
+
+
+def origin_range(horizon=HORIZON, lookback=LOOKBACK):
+    """``(first, last)`` origins whose lookback window and target year are in the data."""
+    years = [int(y) for y in year_columns("defence_budget")]
+    return years[0] + lookback, years[-1] - horizon
+
+
+def run_backtest(origins=None, horizon=HORIZON, lookback=LOOKBACK, workers=None):
+    """One row per origin; ``workers=1`` runs in-process."""
+    origins = list(origins or range(FIRST_ORIGIN, LAST_ORIGIN + 1))
+    first, last = origin_range(horizon, lookback)
+    outside = [o for o in origins if not first <= o <= last]
+    if outside:
+        raise ValueError(f"origins {outside} outside {first}-{last} "
+                         f"(lookback {lookback} and horizon {horizon} must stay within the data)")
+    args = [(o, horizon, lookback) for o in origins]
+    if workers == 1:
+        rows = [backtest_origin(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            rows = list(pool.map(backtest_origin, *zip(*args)))
+    return pd.DataFrame(rows)
+
+
+@st.cache_data
+def load_backtest(horizon=HORIZON, lookback=LOOKBACK):
+    """Backtest for the page; origins come from the disk cache after the first run."""
+    return run_backtest(horizon=horizon, lookback=lookback, workers=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--first", type=int, default=FIRST_ORIGIN)
+    parser.add_argument("--last", type=int, default=LAST_ORIGIN)
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--lookback", type=int, default=LOOKBACK)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    first, last = origin_range(args.horizon, args.lookback)
+    if not first <= args.first <= args.last <= last:
+        parser.error(f"with --horizon {args.horizon} and --lookback {args.lookback}, "
+                     f"origins must satisfy {first} <= --first <= --last <= {last}")
+    start = time.perf_counter()
+    report = run_backtest(range(args.first, args.last + 1), args.horizon, args.lookback, args.workers)
+    print(report.to_string(index=False, float_format="{:.3f}".format))
+    means = report.mean(numeric_only=True)
+    print(f"mean spearman {means['spearman']:.3f} (persistence {means['persistence_spearman']:.3f}), "
+          f"top-10 overlap {means['top10_overlap']:.2f} (persistence {means['persistence_top10_overlap']:.2f})")
+    print(f"{len(report)} origins in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Indexed (country × year) matrix over ``Cleaned_Defence_Budget.csv``.
+
+Window queries gather a whole block of rows and years with one fancy-index
+into a dense NumPy array instead of filtering, transposing and casting the
+frame once per country. Years outside the data come back as NaN, so every
+window shares the same aligned axis.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.countries import load_country_index
+from utils.paths import DATA_DIR
+
+BUDGET_PATH = DATA_DIR / "Cleaned_Defence_Budget.csv"
+
+
+class BudgetMatrix:
+    """Dense %GDP matrix with a country-name row index and contiguous years."""
+
+    def __init__(self, df):
+        year_cols = sorted((c for c in df.columns if str(c).isdigit()), key=int)
+        first, last = int(year_cols[0]), int(year_cols[-1])
+        full = [str(y) for y in range(first, last + 1)]
+        block = df.reindex(columns=full).apply(pd.to_numeric, errors="coerce")
+        self.countries = df["Country Name"].tolist()
+        self.codes = df["Country Code"].tolist()
+        self.years = np.arange(first, last + 1)
+        self.values = block.to_numpy(dtype=float)
+        self.row = {name: i for i, name in enumerate(self.countries)}
+        self.row_iso3 = {code: i for i, code in enumerate(self.codes)}
+
+    def lookup(self, country):
+        """Row for a country name in any dataset's spelling, else None."""
+        if country in self.row:
+            return self.row[country]
+        raw_to_iso3, _ = load_country_index()
+        return self.row_iso3.get(raw_to_iso3.get(country))
+
+    def rows_for(self, countries):
+        """Row positions for the names that exist, and those names."""
+        rows = [(c, self.lookup(c)) for c in countries]
+        found = [(c, r) for c, r in rows if r is not None]
+        return np.array([r for _, r in found], dtype=int), [c for c, _ in found]
+
+    def gather(self, rows, centers, before=2, after=2):
+        """(len(rows) × window) block; row i is centred on ``centers[i]``."""
+        offsets = np.arange(-before, after + 1)
+        cols = np.asarray(centers, dtype=int)[:, None] - self.years[0] + offsets
+        valid = (cols >= 0) & (cols < len(self.years))
+        out = np.full(cols.shape, np.nan)
+        if len(rows):
+            r = np.broadcast_to(np.asarray(rows)[:, None], cols.shape)
+            out[valid] = self.values[r[valid], cols[valid]]
+        return out
+
+    def window(self, countries, year, before=2, after=2):
+        """Countries × calendar-year frame around ``year``."""
+        rows, found = self.rows_for(countries)
+        block = self.gather(rows, np.full(len(rows), year), before, after)
+        return pd.DataFrame(block, index=found, columns=np.arange(year - before, year + after + 1))
+
+    def conflict_windows(self, catalogue, before=2, after=2, names=None):
+        """
+        Participant windows for many conflicts in one call.
+
+        Returns a frame indexed by (conflict, country) with columns for the
+        offset from the conflict year (``-before`` … ``after``).
+        """
+        keys, rows, centers = [], [], []
+        for name in names if names is not None else catalogue.names():
+            rec = catalogue[name]
+            for country in rec["countries"]:
+                row = self.lookup(country)
+                if row is not None:
+                    keys.append((name, country))
+                    rows.append(row)
+                    centers.append(rec["year"])
+        block = self.gather(np.array(rows, dtype=int), np.array(centers, dtype=int), before, after)
+        index = pd.MultiIndex.from_tuples(keys, names=["conflict", "country"])
+        return pd.DataFrame(block, index=index, columns=np.arange(-before, after + 1))
+
+
+@st.cache_resource
+def load_budget_matrix():
+    """Shared budget matrix built once per process."""
+    return BudgetMatrix(pd.read_csv(BUDGET_PATH))
@@ -0,0 +1,171 @@
+"""
+Plotly figure builders shared by the pages.
+
+``animated_choropleth`` puts every year of a year-wide sheet into one
+figure as animation frames, on a colour range shared by all years, so the
+browser scrubs between years without a server rerun per slider step.
+
+``animated_bars`` is a horizontal bar race with one trace per frame, each
+bar coloured by its category and a legend of one empty trace per
+category; ``px.bar(color=..., animation_frame=...)`` builds a trace per
+category per frame, several times slower.
+
+``timeseries_figure`` draws many series (one per country, say) as WebGL
+``Scattergl`` traces. Up to ``LEGEND_LIMIT`` series get a trace and a
+legend entry each; beyond that they are packed into one trace per palette
+colour, separated by gaps, with the series name in the hover. Series
+longer than their share of ``MAX_POINTS`` are thinned with LTTB
+(largest-triangle-three-buckets), which preserves the shape of each line.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+LEGEND_LIMIT = 20
+MAX_POINTS = 20000
+MIN_POINTS_PER_SERIES = 100
+
+
+def shared_range(values, upper_quantile=1.0, floor=None):
+    """One ``(low, high)`` colour range for every frame of an animation."""
+    low = values.min() if floor is None else floor
+    return float(low), float(values.quantile(upper_quantile))
+
+
+@st.cache_data
+def animated_choropleth(df, locations, hover_name, years, value_name="Value", upper_quantile=1.0,
+                        floor=None, hovertemplate=None, start_year=None, **kwargs):
+    """
+    Choropleth of ``df``'s year columns ``years`` with one frame per year.
+
+    Values are melted once and coloured on ``shared_range``; the figure
+    opens on ``start_year`` (default: the last year with data). Extra
+    keyword arguments go to ``px.choropleth``. Cached on the arguments, so
+    a changed frame builds a new figure.
+    """
+    long = (
+        df.melt(id_vars=[locations, hover_name], value_vars=list(years), var_name="Year", value_name=value_name)
+        .dropna(subset=[value_name])
+    )
+    fig = px.choropleth(
+        long,
+        locations=locations,
+        color=value_name,
+        hover_name=hover_name,
+        animation_frame="Year",
+        range_color=shared_range(long[value_name], upper_quantile, floor),
+        **kwargs,
+    )
+    if hovertemplate:
+        fig.update_traces(hovertemplate=hovertemplate)
+        for frame in fig.frames:
+            for trace in frame.data:
+                trace.hovertemplate = hovertemplate
+
+    # Open on the requested year instead of the first one
+    names = [frame.name for frame in fig.frames]
+    start = names.index(str(start_year)) if str(start_year) in names else len(names) - 1
+    for trace, frame_trace in zip(fig.data, fig.frames[start].data):
+        trace.update(locations=frame_trace.locations, z=frame_trace.z,
+                     hovertext=frame_trace.hovertext, customdata=frame_trace.customdata)
+    fig.layout.sliders[0].active = start
+    fig.layout.sliders[0].currentvalue = {"prefix": "Year: "}
+    # No transition easing: scrubbing should swap frames immediately
+    for button in fig.layout.updatemenus[0].buttons:
+        button.args[1]["transition"] = {"duration": 0}
+    fig.layout.sliders[0].transition = {"duration": 0}
+    return fig
+
+
+def animated_bars(df, x, y, frame, palette=px.colors.qualitative.Plotly, **kwargs):
+    """
+    Horizontal bars of ``x`` per ``y`` with one frame per ``frame`` value.
+
+    Bars keep one colour per ``y`` value across frames. The legend comes
+    from empty legend-only traces, one per ``y`` value, which the frames
+    leave alone (so its entries do not toggle bars). Extra keyword
+    arguments go to ``px.bar``.
+    """
+    colors = {name: palette[i % len(palette)] for i, name in enumerate(df[y].unique())}
+    fig = px.bar(df, x=x, y=y, animation_frame=frame, orientation="h", **kwargs)
+    for trace in [*fig.data, *(trace for f in fig.frames for trace in f.data)]:
+        trace.marker.color = [colors[name] for name in trace.y]
+        trace.showlegend = False
+    for f in fig.frames:
+        f.traces = [0]
+    fig.add_traces([
+        go.Bar(x=[None], y=[None], orientation="h", name=str(name), marker_color=color, showlegend=True)
+        for name, color in colors.items()
+    ])
+    fig.update_layout(legend=dict(title_text=y, itemclick=False, itemdoubleclick=False))
+    return fig
+
+
+# ─── TIME SERIES ───────────────────────────────────────────────────────────────
+def lttb(x, y, threshold):
+    """Indices of at most ``threshold`` points of ``(x, y)`` chosen by LTTB."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    every = (n - 2) / (threshold - 2)
+    out = np.empty(threshold, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # Keep the point spanning the largest triangle with the previous pick
+        # and the next bucket's average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def _thin(x, y, budget):
+    if len(x) <= budget or not np.issubdtype(np.asarray(x).dtype, np.number):
+        return x, y
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    idx = lttb(x, y, budget)
+    return x[idx], y[idx]
+
+
+def timeseries_figure(df, x, y, series, mode="lines", hovertemplate=None, marker=None,
+                      hoverlabel=None, max_points=MAX_POINTS, legend_limit=LEGEND_LIMIT,
+                      palette=px.colors.qualitative.Plotly):
+    """
+    ``Scattergl`` figure of long-format ``df``: one line per ``series`` value.
+
+    ``hovertemplate`` can use ``%{customdata}`` for the series name.
+    """
+    groups = [(str(name), g.sort_values(x)) for name, g in df.groupby(series, sort=False, observed=True)]
+    budget = max(max_points // max(len(groups), 1), MIN_POINTS_PER_SERIES)
+    lines = []
+    for name, g in groups:
+        xs, ys = _thin(g[x].to_numpy(), g[y].to_numpy(dtype=float), budget)
+        lines.append((name, xs, ys))
+
+    style = dict(mode=mode, hovertemplate=hovertemplate, marker=marker, hoverlabel=hoverlabel)
+    fig = go.Figure()
+    if len(lines) <= legend_limit:
+        for name, xs, ys in lines:
+            fig.add_trace(go.Scattergl(x=xs, y=ys, name=name, customdata=np.full(len(xs), name, dtype=object), **style))
+        return fig
+
+    # Too many for a legend: one trace per colour, series separated by a gap
+    for c, color in enumerate(palette[:len(lines)]):
+        xs, ys, names = [], [], []
+        for name, sx, sy in lines[c::len(palette)]:
+            xs += [*sx, None]
+            ys += [*sy, None]
+            names += [name] * len(sx) + [None]
+        fig.add_trace(go.Scattergl(
+            x=xs, y=ys, customdata=names, showlegend=False,
+            line=dict(color=color), connectgaps=False, **style,
+        ))
+    return fig
@@ -0,0 +1,208 @@
+"""
+Country clusters over strength and spending profiles, precomputed.
+
+Two nodes of the artifact graph (``utils.pipeline``):
+
+- ``cluster_features``: one row per country of the 2024 strength table,
+  with the seven strength metrics of ``utils.predictions`` (log-scaled) and
+  the mean and trend of its budget share over ``RECENT_YEARS``, all
+  standardized. Countries without budget data sit at the average for
+  those two columns.
+- ``clusters``: k-means and Ward hierarchical assignments for every k in
+  ``K_RANGE``, silhouette scores, the k-means centres and the linkage
+  matrix. Cluster 1 is always the strongest group (highest mean strength
+  features), so colours stay meaningful across k.
+
+The page only reads the stored result. Rebuilding is incremental: when a
+data change leaves the feature matrix as it was (and the parameters and
+this module are unchanged too), the previous result is stored again
+without fitting; otherwise k-means starts from the previous
+centres (one initialisation per k) and only falls back to a full fit when
+the feature set itself changed::
+
+    python -m utils.clusters
+"""
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import pipeline
+from utils.artifacts import file_digest, load_artifact
+from utils.datasets import read_dataset
+from utils.lazy import lazy_import
+from utils.predictions import METRICS
+
+cluster = lazy_import("sklearn.cluster")
+metrics = lazy_import("sklearn.metrics")
+hierarchy = lazy_import("scipy.cluster.hierarchy")
+
+FEATURES = "cluster_features"
+ARTIFACT = "clusters"
+RECENT_YEARS = range(2011, 2021)
+BUDGET_FEATURES = ["budget_mean_recent", "budget_trend_recent"]
+K_RANGE = range(2, 11)
+METHODS = ("kmeans", "hierarchical")
+N_INIT = 10
+SEED = 0
+
+
+# ─── FEATURES ──────────────────────────────────────────────────────────────────
+def build_features():
+    """Standardized strength and recent-budget features per country."""
+    strength, _ = read_dataset("strength_2024")
+    budget, _ = read_dataset("defence_budget")
+    df = strength[["country", "country_code", *METRICS]].copy()
+    for m in METRICS:
+        df[m] = np.log1p(pd.to_numeric(df[m], errors="coerce").clip(lower=0))
+    df = df.dropna(subset=METRICS)
+
+    years = [str(y) for y in RECENT_YEARS if str(y) in budget.columns]
+    recent = budget.drop_duplicates("Country Name").set_index("Country Name")[years].reindex(df["country"])
+    values = recent.to_numpy(dtype=float)
+    t = np.arange(len(years), dtype=float)
+    observed = np.isfinite(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n = observed.sum(axis=1)
+        tbar = (t * observed).sum(axis=1) / n
+        ybar = np.where(observed, values, 0).sum(axis=1) / n
+        dt = np.where(observed, t - tbar[:, None], 0)
+        trend = (dt * np.where(observed, values - ybar[:, None], 0)).sum(axis=1) / (dt ** 2).sum(axis=1)
+    df["budget_mean_recent"] = ybar
+    df["budget_trend_recent"] = np.where(n >= 3, trend, np.nan)
+
+    columns = [*METRICS, *BUDGET_FEATURES]
+    block = df[columns]
+    df[columns] = ((block - block.mean()) / block.std(ddof=0)).fillna(0.0)
+    pipeline.save(FEATURES, {"features": df.reset_index(drop=True)}, columns=columns)
+
+
+pipeline.register(FEATURES, build_features, deps=["dataset_strength_2024", "dataset_defence_budget"])
+
+
+# ─── CLUSTERING ────────────────────────────────────────────────────────────────
+def _relabel(labels, power):
+    """Renumber clusters 1..k by descending mean ``power``."""
+    means = pd.Series(power).groupby(labels).mean().sort_values(ascending=False)
+    mapping = {old: new for new, old in enumerate(means.index, start=1)}
+    return np.array([mapping[label] for label in labels]), mapping
+
+
+def _kmeans(X, k, init=None):
+    if init is None:
+        return cluster.KMeans(n_clusters=k, n_init=N_INIT, random_state=SEED).fit(X)
+    return cluster.KMeans(n_clusters=k, init=init, n_init=1, random_state=SEED).fit(X)
+
+
+def _input_digest(features, columns):
+    """Hash of everything a clustering depends on: features, parameters and this module."""
+    h = hashlib.sha256(pd.util.hash_pandas_object(features[["country", *columns]], index=False).to_numpy().tobytes())
+    h.update(repr((list(K_RANGE), METHODS, N_INIT, SEED)).encode())
+    h.update(file_digest(__file__).encode())
+    return h.hexdigest()[:16]
+
+
+def _own_meta(meta):
+    """A stored result's metadata without the fields ``save`` writes itself."""
+    return {key: value for key, value in meta.items() if key not in ("fingerprint", "frames")}
+
+
+def build_clusters():
+    """Assignments, silhouettes, centres and linkage for every k in ``K_RANGE``."""
+    start = time.perf_counter()
+    frames, meta = pipeline.load(FEATURES)
+    features, columns = frames["features"], meta["columns"]
+    digest = _input_digest(features, columns)
+
+    previous = load_artifact(ARTIFACT)
+    if previous is not None and previous[1].get("features") == digest:
+        old_frames, old_meta = previous
+        pipeline.save(ARTIFACT, old_frames, **{**_own_meta(old_meta), "refresh": "reused"})
+        return
+
+    old_centres = None
+    if previous is not None and previous[1].get("columns") == columns:
+        old_centres = previous[0]["centres"]
+
+    X = features[columns].to_numpy(dtype=float)
+    power = X[:, :len(METRICS)].mean(axis=1)
+    assignments = features[["country", "country_code"]].copy()
+    scores, centres, iterations = [], [], {}
+    Z = hierarchy.linkage(X, method="ward")
+    for k in K_RANGE:
+        init = None
+        if old_centres is not None:
+            init = old_centres.loc[old_centres["k"] == k, columns].to_numpy(dtype=float)
+            init = init if len(init) == k else None
+        km = _kmeans(X, k, init)
+        iterations[k] = int(km.n_iter_)
+        labels, mapping = _relabel(km.labels_, power)
+        assignments[f"kmeans_{k}"] = labels
+        order = sorted(mapping, key=mapping.get)
+        centres.append(pd.DataFrame(km.cluster_centers_[order], columns=columns).assign(k=k, cluster=range(1, k + 1)))
+        scores.append({"method": "kmeans", "k": k, "silhouette": metrics.silhouette_score(X, labels),
+                       "inertia": km.inertia_})
+
+        labels, _ = _relabel(hierarchy.fcluster(Z, k, criterion="maxclust"), power)
+        assignments[f"hierarchical_{k}"] = labels
+        scores.append({"method": "hierarchical", "k": k, "silhouette": metrics.silhouette_score(X, labels),
+                       "inertia": np.nan})
+
+    pipeline.save(
+        ARTIFACT,
+        {
+            "assignments": assignments,
+            "scores": pd.DataFrame(scores),
+            "centres": pd.concat(centres, ignore_index=True),
+            "linkage": pd.DataFrame(Z, columns=["left", "right", "height", "size"]),
+        },
+        columns=columns,
+        features=digest,
+        refresh="warm" if old_centres is not None else "full",
+        iterations=iterations,
+        fit_seconds=round(time.perf_counter() - start, 3),
+    )
+
+
+pipeline.register(ARTIFACT, build_clusters, deps=[FEATURES])
+
+
+# ─── LOADING ───────────────────────────────────────────────────────────────────
+def load_clusters():
+    """``(frames, meta, features)``: the stored clustering and the standardized features."""
+    return _load_clusters(pipeline.fingerprint_of(ARTIFACT))
+
+
+@st.cache_data
+def _load_clusters(artifact_fingerprint):
+    frames, meta = pipeline.load(ARTIFACT)
+    feature_frames, _ = pipeline.load(FEATURES)
+    return frames, meta, feature_frames["features"]
+
+
+def best_k(scores, method):
+    """The k with the highest silhouette for ``method``."""
+    rows = scores[scores["method"] == method]
+    return int(rows.loc[rows["silhouette"].idxmax(), "k"])
+
+
+def main():
+    start = time.perf_counter()
+    report = pipeline.build([ARTIFACT])
+    frames, meta = load_artifact(ARTIFACT)
+    scores = frames["scores"].pivot(index="k", columns="method", values="silhouette")
+    print(scores.to_string(float_format="{:.3f}".format))
+    for method in METHODS:
+        print(f"{method}: best k = {best_k(frames['scores'], method)}")
+    seconds = ", ".join(f"{row['node']} {row['seconds']:.2f}s" for row in report)
+    print(f"{len(frames['assignments'])} countries, refresh: {meta['refresh']}; {seconds}; "
+          f"total {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    # Nodes register on ``utils.clusters``, not on this ``__main__`` copy
+    from utils.clusters import main
+
+    main()
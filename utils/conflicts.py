@@ -0,0 +1,110 @@
+"""
+Conflict catalogue loaded from ``data/conflicts.json``.
+
+Each record carries its own metadata, map markers, strength snapshot and
+image asset name, so conflicts in the same year no longer share a slot.
+Region, year and country indexes are built once per process; selecting
+and rendering a conflict is then a dictionary lookup regardless of how
+many conflicts the file holds.
+"""
+import json
+from collections import defaultdict
+
+import streamlit as st
+
+from utils.lazy import lazy_import
+from utils.paths import DATA_DIR
+
+geopy_exc = lazy_import("geopy.exc")
+
+CONFLICTS_PATH = DATA_DIR / "conflicts.json"
+
+
+class ConflictCatalogue:
+    """Conflict records plus name, region, year and country indexes."""
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda r: (r["year"], r["name"]))
+        self.by_name = {}
+        self.by_region = defaultdict(list)
+        self.by_year = defaultdict(list)
+        self.by_country = defaultdict(list)
+        for rec in self.records:
+            rec["region"] = rec["region"].strip()
+            if rec["name"] in self.by_name:
+                raise ValueError(f"Duplicate conflict name: {rec['name']}")
+            self.by_name[rec["name"]] = rec
+            self.by_region[rec["region"]].append(rec["name"])
+            self.by_year[rec["year"]].append(rec["name"])
+            for country in rec["countries"]:
+                self.by_country[country].append(rec["name"])
+        self.regions = sorted(self.by_region)
+        self.years = sorted(self.by_year)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def names(self):
+        return [rec["name"] for rec in self.records]
+
+    def in_region(self, region):
+        return self.by_region.get(region, [])
+
+    def in_year(self, year):
+        return self.by_year.get(year, [])
+
+    def involving(self, country):
+        return self.by_country.get(country, [])
+
+
+def read_catalogue(path=CONFLICTS_PATH):
+    """Parse the conflict file into a ``ConflictCatalogue`` (no caching)."""
+    with open(path, encoding="utf-8") as fh:
+        payload = json.load(fh)
+    return ConflictCatalogue(payload["conflicts"])
+
+
+@st.cache_resource
+def load_catalogue():
+    """Shared catalogue instance; cache_resource avoids a copy per rerun."""
+    return read_catalogue()
+
+
+def coordinates(rec):
+    """Every (lat, lon) pair a conflict's page may reverse-geocode."""
+    points = [(rec["location"]["lat"], rec["location"]["lon"])]
+    for move in rec["troop_movements"][:1]:
+        points += [(move["from"]["lat"], move["from"]["lon"]), (move["to"]["lat"], move["to"]["lon"])]
+    return points
+
+
+@st.cache_resource
+def _reverse_geocoder():
+    # Nominatim allows one request per second; the limiter is shared by
+    # every session and the warm-up job
+    from geopy.extra.rate_limiter import RateLimiter
+    from geopy.geocoders import Nominatim
+
+    geolocator = Nominatim(user_agent="conflict_dashboard")
+    return RateLimiter(geolocator.reverse, min_delay_seconds=1, max_retries=0, swallow_exceptions=False)
+
+
+@st.cache_data
+def reverse_geocode(lat, lon):
+    """Nominatim place name for a coordinate; raises if the service fails."""
+    loc = _reverse_geocoder()((lat, lon), language="en")
+    return loc.address if loc else f"{lat:.2f}, {lon:.2f}"
+
+
+def location_name(lat, lon):
+    """Place name for a coordinate; falls back to the coordinates if the geocoder is unreachable."""
+    try:
+        return reverse_geocode(float(lat), float(lon))
+    except geopy_exc.GeopyError:
+        return f"{lat:.2f}, {lon:.2f}"
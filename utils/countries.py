@@ -0,0 +1,154 @@
+"""
+Canonical ISO3 index for the country keys used across datasets.
+
+Budget, strength, trade, expenditure, company and conflict data each spell
+countries differently (``United States``, ``U S A``, ``U.S.``...). The index
+maps every raw spelling found in ``data/`` to an ISO3 code and a canonical
+short name. It is built offline with ``country_converter`` (plus manual
+overrides for abbreviations it cannot parse) and stored in
+``data/country_index.csv``; at request time lookups are plain dict joins.
+
+Rebuild after adding a dataset or new spellings::
+
+    python -m utils.countries
+"""
+import json
+import logging
+
+import pandas as pd
+import streamlit as st
+
+from utils.paths import DATA_DIR
+
+INDEX_PATH = DATA_DIR / "country_index.csv"
+
+# (file, column, read_kwargs) for every dataset that names countries
+SOURCES = [
+    ("Cleaned_Defence_Budget.csv", "Country Name", {}),
+    ("military_data.csv", "country", {}),
+    ("2024_military_strength_by_country.csv", "country", {}),
+    ("exports_imports_cleaned.csv", "country", {}),
+    ("trade_events_updated2.csv", "country", {"encoding": "latin-1"}),
+    ("updated_defense_companies_2005_2020.csv", "Country", {}),
+    ("defence_companies_from_2005_final.csv", "Country", {}),
+    ("Military_Expenditure_final_rounded.xlsx", "Name", {}),
+]
+
+# Spellings country_converter misreads or cannot resolve. None marks
+# non-country entries (aggregates, unspecified partners) explicitly.
+OVERRIDES = {
+    "AMERI SAMOA": "ASM",
+    "ANTARTICA": "ATA",
+    "BAHARAIN IS": "BHR",
+    "Beliz": "BLZ",
+    "BR VIRGN IS": "VGB",
+    "C AFRI REP": "CAF",
+    "CANARY IS": "ESP",
+    "CHANNEL IS": None,
+    "CONGO D. REP.": "COD",
+    "CONGO P REP": "COG",
+    "DOMINIC REP": "DOM",
+    "FR POLYNESIA": "PYF",
+    "FR S ANT TR": "ATF",
+    "HEARD MACDONALD": "HMD",
+    "INSTALLATIONS IN INTERNATIONAL WATERS": None,
+    "KOREA DP RP": "PRK",
+    "KOREA RP": "KOR",
+    "KYRGHYZSTAN": "KGZ",
+    "NETHERLAND": "NLD",
+    "NETHERLANDANTIL": "ANT",
+    "NEUTRAL ZONE": None,
+    "PACIFIC IS": None,
+    "PAPUA N GNA": "PNG",
+    "SAHARWI A.DM RP": "ESH",
+    "SAUDI ARAB": "SAU",
+    "ST KITT N A": "KNA",
+    "ST PIERRE": "SPM",
+    "STATE OF PALEST": "PSE",
+    "SVALLBARD AND J": "SJM",
+    "U ARAB EMTS": "ARE",
+    "U K": "GBR",
+    "U S A": "USA",
+    "UNION OF SERBIA & MONTENEGRO": "SCG",
+    "UNSPECIFIED": None,
+    "VIETNAM SOC REP": "VNM",
+    "Korea": "KOR",
+    "Netherlands/France": None,
+    "So Africa": "ZAF",
+    "So. Korea": "KOR",
+    "Soviet Union": "SUN",
+    "U.S": "USA",
+}
+
+# Historical codes that country_converter does not list
+EXTRA_NAMES = {"ANT": "Netherlands Antilles", "SCG": "Serbia and Montenegro", "SUN": "Soviet Union"}
+
+
+def _raw_names():
+    names = set()
+    for file, column, kwargs in SOURCES:
+        path = DATA_DIR / file
+        frame = pd.read_excel(path, usecols=[column]) if path.suffix == ".xlsx" else pd.read_csv(path, usecols=[column], **kwargs)
+        names.update(frame[column].dropna().astype(str))
+    with open(DATA_DIR / "conflicts.json", encoding="utf-8") as fh:
+        for rec in json.load(fh)["conflicts"]:
+            names.update(rec["countries"])
+    return sorted(names)
+
+
+def build_index():
+    """Resolve every raw spelling once and write ``data/country_index.csv``."""
+    import country_converter as coco
+
+    logging.getLogger("country_converter").setLevel(logging.ERROR)
+    cc = coco.CountryConverter()
+    valid = set(cc.data["ISO3"])
+    raw = _raw_names()
+    converted = cc.convert(raw, to="ISO3", not_found=None)
+    rows = []
+    for name, iso3 in zip(raw, converted):
+        if name in OVERRIDES:
+            iso3 = OVERRIDES[name]
+        elif not (isinstance(iso3, str) and iso3 in valid):
+            # Aggregates such as "World" or "Arab World" stay unmapped
+            iso3 = None
+        rows.append((name, iso3))
+    index = pd.DataFrame(rows, columns=["raw", "iso3"])
+    mapped = index["iso3"].dropna().unique().tolist()
+    short = dict(zip(mapped, cc.convert(mapped, src="ISO3", to="name_short", not_found=None)))
+    short.update(EXTRA_NAMES)
+    index["name"] = index["iso3"].map(short)
+    index.to_csv(INDEX_PATH, index=False)
+    return index
+
+
+@st.cache_resource
+def load_country_index():
+    """``raw spelling -> ISO3`` and ``ISO3 -> canonical name`` dictionaries."""
+    index = pd.read_csv(INDEX_PATH, keep_default_na=False, na_values=[""])
+    mapped = index.dropna(subset=["iso3"])
+    return dict(zip(mapped["raw"], mapped["iso3"])), dict(zip(mapped["iso3"], mapped["name"]))
+
+
+def to_iso3(values):
+    """Map raw country spellings to ISO3 (NaN where unknown or not a country)."""
+    raw_to_iso3, _ = load_country_index()
+    return pd.Series(values).map(raw_to_iso3)
+
+
+def with_iso3(df, column, target="iso3"):
+    """Copy of ``df`` with an ISO3 column derived from ``column``."""
+    raw_to_iso3, _ = load_country_index()
+    return df.assign(**{target: df[column].map(raw_to_iso3)})
+
+
+def canonical_name(iso3):
+    """Canonical short name for an ISO3 code."""
+    _, names = load_country_index()
+    return names.get(iso3, iso3)
+
+
+if __name__ == "__main__":
+    idx = build_index()
+    print(f"wrote {INDEX_PATH.name}: {len(idx)} spellings, {idx['iso3'].nunique()} countries, "
+          f"{idx['iso3'].isna().sum()} unmapped")
@@ -0,0 +1,141 @@
+"""
+Cached loaders for the raw datasets under ``data/``.
+
+Pages and the warm-up job (``python -m utils.warmup``) call the same
+functions, so they share one ``st.cache_data`` entry per dataset instead
+of each page keeping a private ``load_data`` that nothing else can reach.
+
+Each file is validated against its schema in ``utils.schema`` and coerced
+to compact dtypes once, when its columnar cache is built: a Parquet
+artifact under ``artifacts/dataset_<name>/`` keyed on the file's contents
+and the schema module (the ``dataset_*`` leaves of ``utils.pipeline``).
+Loaders read that artifact, so pages receive typed,
+validated frames and no process re-parses or re-checks the raw file until
+it changes. Build every cache ahead of time with::
+
+    python -m utils.datasets
+"""
+import time
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from utils import pipeline, schema
+from utils.budget import BUDGET_PATH
+from utils.paths import DATA_DIR
+from utils.schema import SchemaError, conform, year_columns
+
+MILITARY_PATH = DATA_DIR / "military_data.csv"
+STRENGTH_PATH = DATA_DIR / "2024_military_strength_by_country.csv"
+EXPENDITURE_PATH = DATA_DIR / "Military_Expenditure_final_rounded.xlsx"
+TRADE_PATH = DATA_DIR / "exports_imports_cleaned.csv"
+TRADE_EVENTS_PATH = DATA_DIR / "trade_events_updated2.csv"
+COMPANIES_PATH = DATA_DIR / "updated_defense_companies_2005_2020.csv"
+
+BUDGET_YEARS = year_columns("defence_budget")
+
+# dataset -> (file, read kwargs)
+SOURCES = {
+    "defence_budget": (BUDGET_PATH, {}),
+    "military": (MILITARY_PATH, {}),
+    "strength_2024": (STRENGTH_PATH, {}),
+    "expenditure": (EXPENDITURE_PATH, {}),
+    "trade": (TRADE_PATH, {}),
+    "trade_events": (TRADE_EVENTS_PATH, {"encoding": "latin-1"}),
+    "companies": (COMPANIES_PATH, {}),
+}
+# Part of every cache key, so editing a schema invalidates cached frames
+SCHEMA_SOURCE = Path(schema.__file__)
+
+
+def read_raw(name):
+    """The dataset exactly as stored on disk."""
+    path, kwargs = SOURCES[name]
+    return pd.read_excel(path, **kwargs) if path.suffix == ".xlsx" else pd.read_csv(path, **kwargs)
+
+
+# ─── COLUMNAR CACHE ────────────────────────────────────────────────────────────
+def _artifact(name):
+    return f"dataset_{name}"
+
+
+def build_dataset(name):
+    """Validate and coerce one raw file, then save it as a Parquet artifact."""
+    df, warnings = conform(name, read_raw(name))
+    pipeline.save(_artifact(name), {"data": df}, rows=len(df), warnings=warnings)
+
+
+def read_dataset(name):
+    """``(frame, warnings)`` for ``name`` from its columnar cache, built on a miss."""
+    frames, meta = pipeline.load(_artifact(name))
+    return frames["data"], meta["warnings"]
+
+
+for _name, (_path, _) in SOURCES.items():
+    pipeline.register(_artifact(_name), lambda name=_name: build_dataset(name), inputs=[_path, SCHEMA_SOURCE])
+
+
+def _dataset(name):
+    """``read_dataset`` for pages: schema problems are shown, not raised."""
+    try:
+        df, warnings = read_dataset(name)
+    except FileNotFoundError:
+        st.error(f"Data file not found at data/{SOURCES[name][0].name}")
+        st.stop()
+    except SchemaError as exc:
+        st.error(f"Dataset does not match its schema: {exc}")
+        st.stop()
+    for warning in warnings:
+        st.warning(warning)
+    return df
+
+
+# ─── LOADERS ───────────────────────────────────────────────────────────────────
+@st.cache_data
+def load_defence_budget():
+    """Defence budget (% of GDP) with numeric year columns, plus those columns."""
+    return _dataset("defence_budget"), BUDGET_YEARS
+
+
+@st.cache_data
+def load_military_data():
+    return _dataset("military")
+
+
+@st.cache_data
+def load_strength_2024():
+    return _dataset("strength_2024")
+
+
+@st.cache_data
+def load_expenditure():
+    """Military expenditure (current USD) rows of the expenditure workbook."""
+    df = _dataset("expenditure")
+    return df[df['Indicator Name'] == 'Military expenditure (current USD)']
+
+
+@st.cache_data
+def load_trade():
+    """India's trade by partner, plus ``(country, year) -> event`` descriptions."""
+    trade_df = _dataset("trade")
+    trade_df['year'] = trade_df['financial_year(start)']
+    events_df = _dataset("trade_events")
+    # (country, year) -> description, so a click is a dict lookup
+    events = events_df.drop_duplicates(['country', 'year']).set_index(['country', 'year'])['event_description'].to_dict()
+    return trade_df, events
+
+
+@st.cache_data
+def load_companies():
+    return _dataset("companies")
+
+
+if __name__ == "__main__":
+    for name in SOURCES:
+        start = time.perf_counter()
+        build_dataset(name)
+        df, warnings = read_dataset(name)
+        print(f"{name:<16} {len(df):>6} rows {df.shape[1]:>4} cols in {time.perf_counter() - start:.2f}s")
+        for warning in warnings:
+            print(f"  warning: {warning}")
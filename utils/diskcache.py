@@ -0,0 +1,246 @@
+"""
+Persistent result cache shared by every Streamlit process on the host.
+
+``st.cache_data`` lives in one process and is lost on restart. Results
+decorated with ``disk_cached`` also store their pickled value in a local
+SQLite database (WAL mode, so many readers and one writer at a time across
+processes). A worker that starts cold, or a sibling behind the load
+balancer, reads the value another worker already computed.
+
+Datasets and derived tables are shared through the Parquet artifacts of
+``utils.pipeline`` instead. This cache holds what is computed from them on
+demand: the forecasts, the backtest origins, the ranking simulation and
+the companies page's default figures (``utils.figures``).
+
+Keys are content-versioned: they hash the function's source, its
+arguments and the contents of the input files it declares, so editing a
+data file or the code simply produces a new key. Entries also expire
+after a TTL, and the least recently used ones are evicted once the
+database grows past its size limit. A hit only reads: access times are
+kept in memory and written in one batch with the next store, or once a
+minute.
+
+Inspect or clear the cache with::
+
+    python -m utils.diskcache stats
+    python -m utils.diskcache clear
+"""
+import argparse
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+
+from utils.artifacts import fingerprint
+from utils.paths import ARTIFACTS_DIR
+from utils.singleflight import SingleFlight
+
+CACHE_PATH = ARTIFACTS_DIR / "cache.sqlite"
+DEFAULT_TTL = 7 * 24 * 3600
+MAX_BYTES = 512 * 1024 * 1024
+# Seconds between batched writes of hit access times
+TOUCH_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+class DiskCache:
+    """Pickled values in SQLite with TTL and LRU size eviction."""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES, default_ttl=DEFAULT_TTL):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        # key -> last hit time, not yet written
+        self._touched = {}
+        self._touch_lock = threading.Lock()
+        self._flushed = time.time()
+
+    def _conn(self):
+        # sqlite3 connections must not cross threads or forked processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        """``(True, value)`` on a live hit, else ``(False, None)``."""
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        value, expires = row
+        if expires is not None and expires < now:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return False, None
+        try:
+            value = pickle.loads(value)
+        except Exception:  # written by an incompatible library version
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return False, None
+        with self._touch_lock:
+            self._touched[key] = now
+        if now - self._flushed > TOUCH_INTERVAL:
+            self.flush_touches()
+        return True, value
+
+    def flush_touches(self, conn=None):
+        """Write the access times of hits since the last flush in one statement."""
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+            self._flushed = time.time()
+        if touched:
+            (conn or self._conn()).executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?", [(t, k) for k, t in touched.items()]
+            )
+
+    def set(self, key, value, name="", ttl=None):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, name, blob, len(blob), now, now + ttl if ttl else None, now),
+            )
+            # Eviction orders by access time, so bring it up to date first
+            self.flush_touches(conn)
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries down to 90% of the limit
+        excess = total - int(self.max_bytes * 0.9)
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if excess <= 0:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            excess -= size
+
+    def stats(self):
+        """Entry count and bytes per cached function."""
+        return self._conn().execute(
+            "SELECT name, COUNT(*), SUM(size) FROM entries GROUP BY name ORDER BY SUM(size) DESC"
+        ).fetchall()
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM entries")
+        conn.execute("VACUUM")
+
+
+_cache = DiskCache()
+_flights = SingleFlight()
+
+
+def _source_digest(fn):
+    try:
+        source = inspect.getsource(fn)
+    except (OSError, TypeError):
+        source = fn.__qualname__
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+def _module_name(fn):
+    # Under ``python -m utils.x`` the module is ``__main__``; key on its real
+    # name so a CLI run fills the entries the pages read
+    module = sys.modules.get(fn.__module__)
+    spec = getattr(module, "__spec__", None)
+    return spec.name if fn.__module__ == "__main__" and spec is not None else fn.__module__
+
+
+def disk_cached(inputs=(), ttl=None, ignore=()):
+    """
+    Decorator: persist results in the shared disk cache.
+
+    ``inputs`` are the data files the result depends on; their contents are
+    part of the key. Arguments are keyed by name with defaults filled in,
+    so ``f(1)`` and ``f(x=1)`` share an entry; ``ignore`` names parameters
+    that do not change the result (e.g. a worker count). Arguments must
+    have a stable ``repr``. Stack it under ``@st.cache_data`` so the disk
+    is only consulted on a per-process miss.
+    """
+    def decorator(fn):
+        name = f"{_module_name(fn)}.{fn.__qualname__}"
+        code = _source_digest(fn)
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = sorted((k, v) for k, v in bound.arguments.items() if k not in ignore)
+            raw = repr((name, code, fingerprint(inputs), params))
+            key = hashlib.sha256(raw.encode()).hexdigest()
+            return _flights.do(key, _get_or_compute, key, name, ttl, fn, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _get_or_compute(key, name, ttl, fn, args, kwargs):
+    try:
+        hit, value = _cache.get(key)
+    except sqlite3.Error:
+        hit = False
+    if hit:
+        return value
+    value = fn(*args, **kwargs)
+    try:
+        _cache.set(key, value, name=name, ttl=ttl)
+    except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError):
+        pass  # the cache is an optimisation; never fail the caller over it
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["stats", "clear"])
+    args = parser.parse_args()
+    if args.command == "clear":
+        _cache.clear()
+        print(f"cleared {CACHE_PATH}")
+        return
+    rows = _cache.stats()
+    for name, count, size in rows:
+        print(f"{name:<50} {count:>5} entries {size / 1e6:>9.2f} MB")
+    print(f"total {sum(r[1] for r in rows)} entries, {sum(r[2] for r in rows) / 1e6:.2f} MB in {CACHE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
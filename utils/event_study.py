@@ -0,0 +1,166 @@
+"""
+Event study of defence spending (%GDP) around conflicts.
+
+Every participant's series is aligned on its conflict year (t = 0) and
+expressed relative to its own pre-conflict mean. The same is done for all
+non-participating countries in the same years to form a baseline, and the
+participant-minus-baseline difference measures the excess response.
+Confidence bands come from a pair bootstrap computed as one multinomial
+weight matrix product per group, so thousands of draws stay cheap.
+
+This is a batch job; the page only reads the stored artifact::
+
+    python -m utils.event_study --n-boot 5000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import pipeline
+from utils.budget import BUDGET_PATH, BudgetMatrix
+from utils.conflicts import CONFLICTS_PATH, read_catalogue
+from utils.countries import INDEX_PATH, to_iso3
+from utils.stats import nanmean
+
+ARTIFACT = "event_study"
+INPUTS = (BUDGET_PATH, CONFLICTS_PATH, INDEX_PATH)
+BEFORE, AFTER = 5, 5
+N_BOOT = 2000
+SEED = 0
+GROUPS = ("participants", "baseline", "difference")
+
+
+def country_rows(matrix):
+    """Row positions of sovereign countries (World Bank aggregates excluded)."""
+    return np.flatnonzero(to_iso3(matrix.countries).notna().to_numpy())
+
+
+def _relative(block, pre):
+    """Subtract each row's pre-period mean; drop rows lacking pre or post data."""
+    rel = block - nanmean(block[:, pre], axis=1, keepdims=True)
+    keep = np.isfinite(rel[:, pre]).any(axis=1) & np.isfinite(rel[:, ~pre]).any(axis=1)
+    return rel, keep
+
+
+def _bootstrap_means(values, n_boot, rng):
+    """(n_boot × T) column means of ``values`` under row resampling."""
+    n = len(values)
+    counts = rng.multinomial(n, np.full(n, 1.0 / n), size=n_boot).astype(float)
+    finite = np.isfinite(values)
+    sums = counts @ np.where(finite, values, 0.0)
+    denom = counts @ finite.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / denom
+
+
+def compute_event_study(matrix, catalogue, before=BEFORE, after=AFTER, n_boot=N_BOOT, seed=SEED):
+    """Return ``{"paths", "deltas", "summary"}`` frames for all conflicts."""
+    offsets = np.arange(-before, after + 1)
+    pre = offsets < 0
+
+    # Participants: one aligned window per (conflict, country)
+    part = matrix.conflict_windows(catalogue, before, after)
+    p_rel, p_keep = _relative(part.to_numpy(), pre)
+    part_index = part.index[p_keep]
+    p_rel = p_rel[p_keep]
+
+    # Baseline: every non-participating country, aligned on the same years
+    countries = country_rows(matrix)
+    b_rows, b_centers, b_conflict = [], [], []
+    for name in catalogue.names():
+        rec = catalogue[name]
+        taken = {matrix.lookup(c) for c in rec["countries"]}
+        rows = [r for r in countries if r not in taken]
+        b_rows.extend(rows)
+        b_centers.extend([rec["year"]] * len(rows))
+        b_conflict.extend([name] * len(rows))
+    base = matrix.gather(np.array(b_rows, dtype=int), np.array(b_centers, dtype=int), before, after)
+    b_rel, b_keep = _relative(base, pre)
+    b_rel = b_rel[b_keep]
+    b_conflict = np.array(b_conflict)[b_keep]
+
+    rng = np.random.default_rng(seed)
+    boot = {"participants": _bootstrap_means(p_rel, n_boot, rng),
+            "baseline": _bootstrap_means(b_rel, n_boot, rng)}
+    boot["difference"] = boot["participants"] - boot["baseline"]
+    point = {"participants": nanmean(p_rel, axis=0), "baseline": nanmean(b_rel, axis=0)}
+    point["difference"] = point["participants"] - point["baseline"]
+
+    paths = pd.concat([
+        pd.DataFrame({
+            "group": group,
+            "offset": offsets,
+            "mean": point[group],
+            "lo": np.nanpercentile(boot[group], 2.5, axis=0),
+            "hi": np.nanpercentile(boot[group], 97.5, axis=0),
+        })
+        for group in GROUPS
+    ], ignore_index=True)
+
+    # Pre/post deltas: post-period mean of the pre-demeaned path
+    p_delta = nanmean(p_rel[:, ~pre], axis=1)
+    b_delta = nanmean(b_rel[:, ~pre], axis=1)
+    base_by_conflict = pd.Series(b_delta).groupby(b_conflict).mean()
+    deltas = pd.DataFrame({
+        "conflict": part_index.get_level_values("conflict"),
+        "country": part_index.get_level_values("country"),
+        "delta": p_delta,
+    })
+    deltas["year"] = deltas["conflict"].map(lambda n: catalogue[n]["year"])
+    deltas["baseline_delta"] = deltas["conflict"].map(base_by_conflict)
+    deltas["excess"] = deltas["delta"] - deltas["baseline_delta"]
+
+    boot_delta = {g: nanmean(boot[g][:, ~pre], axis=1) for g in GROUPS}
+    point_delta = {g: nanmean(point[g][~pre]) for g in GROUPS}
+    summary = pd.DataFrame({
+        "group": list(GROUPS),
+        "delta": [point_delta[g] for g in GROUPS],
+        "lo": [np.nanpercentile(boot_delta[g], 2.5) for g in GROUPS],
+        "hi": [np.nanpercentile(boot_delta[g], 97.5) for g in GROUPS],
+        "n": [len(p_rel), len(b_rel), len(p_rel)],
+    })
+    return {"paths": paths, "deltas": deltas, "summary": summary}
+
+
+def build_event_study(before=BEFORE, after=AFTER, n_boot=N_BOOT, seed=SEED):
+    """Recompute the event study from the data files and store the artifact."""
+    params = {"before": before, "after": after, "n_boot": n_boot, "seed": seed}
+    matrix = BudgetMatrix(pd.read_csv(BUDGET_PATH))
+    frames = compute_event_study(matrix, read_catalogue(), **params)
+    pipeline.save(ARTIFACT, frames, params=params)
+    return frames, params
+
+
+pipeline.register(ARTIFACT, build_event_study, inputs=INPUTS,
+                  params={"before": BEFORE, "after": AFTER, "n_boot": N_BOOT, "seed": SEED})
+
+
+def load_event_study():
+    """``(frames, params)`` of the stored run, rebuilt with defaults if stale."""
+    return _load_event_study(pipeline.fingerprint_of(ARTIFACT))
+
+
+@st.cache_data
+def _load_event_study(artifact_fingerprint):
+    frames, meta = pipeline.load(ARTIFACT)
+    return frames, meta["params"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--before", type=int, default=BEFORE)
+    parser.add_argument("--after", type=int, default=AFTER)
+    parser.add_argument("--n-boot", type=int, default=N_BOOT)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    frames, _ = build_event_study(args.before, args.after, args.n_boot, args.seed)
+    print(frames["summary"].to_string(index=False))
+    print(f"event study built in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
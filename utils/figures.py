@@ -0,0 +1,93 @@
+"""
+Default figures of the companies page, built once per host.
+
+Each figure is cached on its widget value alone (top N), in memory and in
+the shared disk cache (``utils.diskcache``), so the warm-up job
+(``utils.warmup``) can build the default view before traffic arrives and
+every session and worker process then reuses it. Keys cover the companies
+file and the modules that build the figures; the data watcher clears the
+in-memory copies when the file changes.
+"""
+from pathlib import Path
+
+import plotly.express as px
+import streamlit as st
+
+from utils import charts, sql, summaries
+from utils.charts import animated_bars
+from utils.datasets import COMPANIES_PATH, SCHEMA_SOURCE
+from utils.diskcache import disk_cached
+from utils.sql import top_countries_per_year
+from utils.summaries import company_evolution
+
+INPUTS = [COMPANIES_PATH, SCHEMA_SOURCE, Path(__file__), Path(charts.__file__), Path(sql.__file__),
+          Path(summaries.__file__)]
+
+
+@st.cache_data
+@disk_cached(inputs=INPUTS)
+def company_revenue_race(top_n):
+    """Animated bars of each year's top ``top_n`` countries by defence revenue."""
+    df = top_countries_per_year(top_n, "revenue").rename(columns={"value": "Defense_Revenue_From_A_Year_Ago"})
+    fig = animated_bars(
+        df,
+        "Defense_Revenue_From_A_Year_Ago",
+        "Country",
+        "Year",
+        title=f"Top {top_n} Countries by Defense Revenue",
+        labels={"Defense_Revenue_From_A_Year_Ago": "Defense Revenue"},
+        height=500
+    )
+    fig.update_layout(
+        xaxis=dict(range=[0, df["Defense_Revenue_From_A_Year_Ago"].max()]),
+        yaxis={'categoryorder': 'total ascending'},
+        margin=dict(t=40, l=0, r=0, b=0)
+    )
+    return fig
+
+
+@st.cache_data
+@disk_cached(inputs=INPUTS)
+def company_count_race(top_n):
+    """Animated bars of each year's top ``top_n`` countries by number of companies."""
+    df = top_countries_per_year(top_n, "companies").rename(columns={"value": "Count"})
+    fig = animated_bars(
+        df,
+        "Count",
+        "Country",
+        "Year",
+        title="Total Number of Companies by Country",
+        labels={"Count": "Number of Companies"},
+        height=500
+    )
+    fig.update_layout(
+        xaxis=dict(range=[0, df["Count"].max()]),
+        yaxis={'categoryorder': 'total ascending'},
+        margin=dict(t=40, l=0, r=0, b=0)
+    )
+    return fig
+
+
+@st.cache_data
+@disk_cached(inputs=INPUTS)
+def company_bubbles(top_n):
+    """Animated bubbles of each year's top ``top_n`` companies."""
+    fig = px.scatter(
+        company_evolution(top_n),
+        x="Total Revenue",
+        y="Defense_Revenue_From_A_Year_Ago",
+        animation_frame="Year",
+        animation_group="Company",
+        size="%of Revenue from Defence",
+        color="Country",
+        hover_name="Company",
+        size_max=60,
+        title="Company Evolution Over Time",
+        labels={
+            "Defense_Revenue_From_A_Year_Ago": "Defense Revenue",
+            "Total Revenue": "Total Revenue",
+            "%of Revenue from Defence": "% from Defense"
+        },
+    )
+    fig.update_layout(margin=dict(t=40, l=0, r=0, b=0))
+    return fig
@@ -0,0 +1,252 @@
+"""
+Per-country forecasts of defence spending, fitted for all countries at once.
+
+Each source is a dense (country × year) matrix with NaN for missing years:
+
+- ``budget``: ``Cleaned_Defence_Budget.csv``, % of GDP, countries only (no
+  World Bank aggregates);
+- ``expenditure``: military expenditure (current USD) from the workbook,
+  modelled on the log scale so forecasts and intervals stay positive.
+
+Models (every one is a handful of array operations over the whole matrix,
+never a Python loop over countries):
+
+- ``linear``: least-squares trend over the observed years;
+- ``ses``: simple exponential smoothing;
+- ``damped``: Holt's damped trend (``PHI``);
+- ``ar``: AR(``AR_ORDER``) with intercept, solved as one batch of normal
+  equations.
+
+The smoothing models pick each country's parameters from a small grid by
+in-sample one-step error, evaluating the whole grid in one pass. Forecasts
+come with normal prediction intervals and are cached per source, model,
+horizon and level::
+
+    python -m utils.forecast --source expenditure --model damped --horizon 10
+"""
+import argparse
+import itertools
+import time
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.budget import BUDGET_PATH
+from utils.countries import INDEX_PATH, to_iso3
+from utils.datasets import EXPENDITURE_PATH, SCHEMA_SOURCE, read_dataset
+from utils.diskcache import disk_cached
+from utils.schema import year_columns
+
+MODELS = ("linear", "ses", "damped", "ar")
+SOURCES = ("budget", "expenditure")
+MIN_OBS = 5
+# Countries whose last observation is older than this are not forecast
+MAX_GAP = 5
+PHI = 0.9
+AR_ORDER = 2
+ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.05, 0.1, 0.2, 0.4)
+MODULE_SOURCE = Path(__file__)
+
+
+# ─── DATA ──────────────────────────────────────────────────────────────────────
+def series_matrix(source):
+    """``(names, codes, years, values)`` with ``values`` a countries × years array."""
+    if source == "budget":
+        df, _ = read_dataset("defence_budget")
+        # World Bank aggregates ("Arab World", income groups) are not countries
+        df = df[to_iso3(df["Country Name"]).notna().to_numpy()]
+        names, codes, years = df["Country Name"], df["Country Code"], year_columns("defence_budget")
+    elif source == "expenditure":
+        df, _ = read_dataset("expenditure")
+        df = df[(df["Indicator Name"] == "Military expenditure (current USD)") & (df["Type"] == "Country")]
+        names, codes, years = df["Name"], df["Code"], year_columns("expenditure")
+    else:
+        raise ValueError(f"unknown source {source!r}; expected one of {SOURCES}")
+    values = df[years].to_numpy(dtype=float)
+    return names.astype(str).to_numpy(), codes.astype(str).to_numpy(), np.array(years, dtype=int), values
+
+
+def _forward_fill(values):
+    """Carry each row's last observation forward along the year axis."""
+    idx = np.where(np.isfinite(values), np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return values[np.arange(len(values))[:, None], idx]
+
+
+# ─── MODELS ────────────────────────────────────────────────────────────────────
+def fit_linear(y, horizon):
+    """Least-squares trend; returns ``(mean, sd)`` arrays of shape countries × horizon."""
+    t = np.arange(y.shape[1], dtype=float)
+    m = np.isfinite(y)
+    n = m.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tbar = (t * m).sum(axis=1) / n
+        ybar = np.where(m, y, 0).sum(axis=1) / n
+        dt = np.where(m, t - tbar[:, None], 0)
+        sxx = (dt ** 2).sum(axis=1)
+        slope = (dt * np.where(m, y - ybar[:, None], 0)).sum(axis=1) / sxx
+        intercept = ybar - slope * tbar
+        resid = np.where(m, y - intercept[:, None] - slope[:, None] * t, 0)
+        sigma = np.sqrt((resid ** 2).sum(axis=1) / (n - 2))
+        th = t[-1] + np.arange(1, horizon + 1)
+        mean = intercept[:, None] + slope[:, None] * th
+        sd = sigma[:, None] * np.sqrt(1 + 1 / n[:, None] + (th - tbar[:, None]) ** 2 / sxx[:, None])
+    return mean, sd
+
+
+def _smooth(y, alpha, beta, phi):
+    """
+    Error-correction Holt recursion over axis 1 for arrays of parameters.
+
+    ``y`` is (..., countries, T) and the parameters broadcast against its
+    leading axes; missing years advance the state without an update.
+    Returns final level, trend, in-sample SSE and error count.
+    """
+    finite = np.isfinite(y)
+    first = finite.argmax(axis=-1)
+    level = np.take_along_axis(y, first[..., None], axis=-1)[..., 0]
+    trend = np.zeros_like(level)
+    sse = np.zeros_like(level)
+    count = np.zeros_like(level)
+    for t in range(y.shape[-1]):
+        pred = level + phi * trend
+        step = finite[..., t] & (t > first)
+        err = np.where(step, y[..., t] - pred, 0.0)
+        sse += err ** 2
+        count += step
+        active = t > first
+        level = np.where(active, pred + alpha * err, level)
+        trend = np.where(active, phi * trend + alpha * beta * err, trend)
+    return level, trend, sse, count
+
+
+def fit_smoothing(y, horizon, damped):
+    """SES (``damped=False``) or damped trend, parameters chosen per country."""
+    grid = list(itertools.product(ALPHAS, BETAS if damped else (0.0,)))
+    alpha = np.array([a for a, _ in grid])[:, None]
+    beta = np.array([b for _, b in grid])[:, None]
+    phi = PHI if damped else 0.0
+    level, trend, sse, count = _smooth(np.broadcast_to(y, (len(grid), *y.shape)), alpha, beta, phi)
+    best = np.argmin(np.where(count > 0, sse, np.inf), axis=0)
+    pick = lambda a: np.take_along_axis(a, best[None], axis=0)[0]  # noqa: E731
+    level, trend, sse, count = pick(level), pick(trend), pick(sse), pick(count)
+    a, b = alpha[best, 0], beta[best, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma = np.sqrt(sse / np.maximum(count - 1, 0))
+    h = np.arange(1, horizon + 1)
+    damp = np.cumsum(phi ** h)  # sum_{i<=h} phi^i
+    mean = level[:, None] + trend[:, None] * damp
+    # Var(h) = sigma² (1 + sum_{j<h} c_j²) with c_j = α(1 + β sum_{i<=j} φ^i)
+    c = a[:, None] * (1 + b[:, None] * damp[:-1]) if horizon > 1 else np.zeros((len(a), 0))
+    var = np.concatenate([np.ones((len(a), 1)), 1 + np.cumsum(c ** 2, axis=1)], axis=1)
+    return mean, sigma[:, None] * np.sqrt(var)
+
+
+def fit_ar(y, horizon, p=AR_ORDER):
+    """AR(p) with intercept by batched least squares over complete lag windows."""
+    n, T = y.shape
+    lags = np.stack([y[:, p - k - 1:T - k - 1] for k in range(p)], axis=-1)  # n × (T-p) × p
+    X = np.concatenate([np.ones((n, T - p, 1)), lags], axis=-1)
+    target = y[:, p:]
+    w = np.isfinite(target) & np.isfinite(lags).all(axis=-1)
+    X0 = np.where(w[..., None], X, 0.0)
+    t0 = np.where(w, target, 0.0)
+    xtx = np.einsum("nti,ntj->nij", X0, X0) + 1e-9 * np.eye(p + 1)
+    xty = np.einsum("nti,nt->ni", X0, t0)
+    coef = np.linalg.solve(xtx, xty[..., None])[..., 0]
+    resid = np.where(w, target - np.einsum("nti,ni->nt", X0, coef), 0.0)
+    dof = w.sum(axis=1) - (p + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma = np.where(dof > 0, np.sqrt((resid ** 2).sum(axis=1) / dof), np.nan)
+
+    # Recursive forecasts from the last p (carried-forward) values
+    recent = list(_forward_fill(y)[:, -p:].T[::-1])  # [y_T, y_{T-1}, ...]
+    phis = coef[:, 1:]
+    psi = [np.ones(n)]
+    mean = np.empty((n, horizon))
+    for h in range(horizon):
+        step = coef[:, 0] + sum(phis[:, k] * recent[k] for k in range(p))
+        mean[:, h] = step
+        recent = [step, *recent[:-1]]
+        psi.append(sum(phis[:, k] * psi[-1 - k] for k in range(min(p, len(psi)))))
+    var = np.cumsum(np.stack(psi[:horizon], axis=1) ** 2, axis=1)
+    return mean, sigma[:, None] * np.sqrt(var)
+
+
+def fit(model, y, horizon):
+    """``(mean, sd)`` of ``model`` for every row of ``y``, ``horizon`` steps ahead."""
+    if model == "linear":
+        mean, sd = fit_linear(y, horizon)
+    elif model == "ses":
+        mean, sd = fit_smoothing(y, horizon, damped=False)
+    elif model == "damped":
+        mean, sd = fit_smoothing(y, horizon, damped=True)
+    elif model == "ar":
+        mean, sd = fit_ar(y, horizon)
+    else:
+        raise ValueError(f"unknown model {model!r}; expected one of {MODELS}")
+    finite = np.isfinite(y)
+    last = y.shape[1] - 1 - finite[:, ::-1].argmax(axis=1)
+    short = (finite.sum(axis=1) < MIN_OBS) | (last < y.shape[1] - 1 - MAX_GAP)
+    mean[short] = np.nan
+    sd[short] = np.nan
+    return mean, sd
+
+
+# ─── FORECASTS ─────────────────────────────────────────────────────────────────
+@st.cache_data
+@disk_cached(inputs=[BUDGET_PATH, EXPENDITURE_PATH, INDEX_PATH, SCHEMA_SOURCE, MODULE_SOURCE])
+def forecast(source="budget", model="damped", horizon=10, level=0.95):
+    """
+    Long frame of forecasts: country, code, year, mean, lower, upper.
+
+    One batched fit covers every country of ``source``; ``level`` is the
+    coverage of the prediction interval.
+    """
+    names, codes, years, values = series_matrix(source)
+    log = source == "expenditure"
+    y = np.log(np.where(values > 0, values, np.nan)) if log else values
+    mean, sd = fit(model, y, horizon)
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    lower, upper = mean - z * sd, mean + z * sd
+    if log:
+        mean, lower, upper = np.exp(mean), np.exp(lower), np.exp(upper)
+    else:
+        lower = np.maximum(lower, 0)  # a share of GDP cannot go negative
+    future = years[-1] + np.arange(1, horizon + 1)
+    out = pd.DataFrame({
+        "country": np.repeat(names, horizon),
+        "code": np.repeat(codes, horizon),
+        "year": np.tile(future, len(names)),
+        "mean": mean.ravel(),
+        "lower": lower.ravel(),
+        "upper": upper.ravel(),
+    })
+    return out.dropna(subset=["mean"]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--source", choices=SOURCES, default="budget")
+    parser.add_argument("--model", choices=MODELS, default="damped")
+    parser.add_argument("--horizon", type=int, default=10)
+    parser.add_argument("--level", type=float, default=0.95)
+    args = parser.parse_args()
+    _, _, _, values = series_matrix(args.source)
+    y = np.log(np.where(values > 0, values, np.nan)) if args.source == "expenditure" else values
+    start = time.perf_counter()
+    fit(args.model, y, args.horizon)
+    fitted = time.perf_counter() - start
+    out = forecast(args.source, args.model, args.horizon, args.level)
+    last = out[out["year"] == out["year"].max()].sort_values("mean", ascending=False)
+    print(last.head(10).to_string(index=False))
+    print(f"{out['country'].nunique()} countries x {args.horizon} years, "
+          f"{args.model} fit in {fitted * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
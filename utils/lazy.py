@@ -0,0 +1,53 @@
+"""
+Deferred imports for heavy optional dependencies.
+
+``lazy_import("matplotlib.pyplot")`` returns a stand-in module that performs
+the real import on first attribute access, so a page only pays for
+scikit-learn, matplotlib, pydeck or geopy when a tab actually draws with
+them. The time each deferred import took is kept in ``IMPORT_TIMES`` for
+the startup profiler (``python -m utils.startup``).
+"""
+import importlib
+import sys
+import threading
+import time
+import types
+
+IMPORT_TIMES = {}
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports ``name`` when first used."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    IMPORT_TIMES[self.__name__] = time.perf_counter() - start
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name):
+    """The module if it is already imported, else a :class:`LazyModule`."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
@@ -0,0 +1,7 @@
+from pathlib import Path
+
+# Repository layout, resolved independently of the working directory
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / "data"
+STATIC_DIR = ROOT_DIR / "static"
+ARTIFACTS_DIR = ROOT_DIR / "artifacts"
@@ -0,0 +1,229 @@
+"""
+Dependency graph of the derived artifacts under ``artifacts/``.
+
+Every artifact is a node that declares the files it reads directly and the
+nodes it is derived from::
+
+    dataset_<name>       one data file, validated   (utils.datasets)
+    predictions          strength score and budget growth slopes
+                         <- dataset_strength_2024, dataset_defence_budget
+    company_aggregates   <- dataset_companies        (utils.summaries)
+    trade_summaries      <- dataset_trade            (utils.summaries)
+    event_study          budget, conflicts, country index
+    country_profiles     every data file, country index
+    cluster_features     <- dataset_strength_2024, dataset_defence_budget
+    clusters             k-means and hierarchical   (utils.clusters)
+                         <- cluster_features
+
+A node's fingerprint hashes its own input files, the module that builds it,
+its build parameters and the fingerprints of its dependencies, so editing one CSV changes the
+fingerprint of exactly the nodes downstream of it. Stale nodes are rebuilt
+on first use (``load``), or ahead of time in dependency order with
+independent branches built in parallel::
+
+    python -m utils.pipeline                 # rebuild whatever is stale
+    python -m utils.pipeline --status        # show each node's state
+    python -m utils.pipeline predictions --force
+
+Nodes are registered by the module that builds them (``register``); a build
+function takes no arguments, reads its dependencies with ``load`` and
+stores its frames with ``save``.
+"""
+import argparse
+import importlib
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from utils.artifacts import fingerprint, load_or_build, read_meta, save_artifact
+from utils.paths import ARTIFACTS_DIR
+from utils.singleflight import file_lock
+
+# Modules whose import registers the graph's nodes
+MODULES = (
+    "utils.datasets", "utils.summaries", "utils.predictions", "utils.event_study", "utils.profiles", "utils.clusters",
+)
+WORKERS = 4
+
+NODES = {}
+
+
+class Node:
+    """One artifact: how to build it and what it is built from."""
+
+    def __init__(self, name, build, inputs=(), deps=(), params=None):
+        self.name = name
+        self.build = build
+        # The building module is an input too: editing the code rebuilds
+        self.inputs = (*inputs, Path(sys.modules[build.__module__].__file__))
+        self.deps = tuple(deps)
+        self.params = params
+
+
+def register(name, build, inputs=(), deps=(), params=None):
+    """
+    Declare artifact ``name``, built by ``build()`` from ``inputs`` and ``deps``.
+
+    ``params`` are the build parameters ``build()`` uses by default; a build
+    run with other values is saved under a different fingerprint.
+    """
+    NODES[name] = Node(name, build, inputs, deps, params)
+    return NODES[name]
+
+
+def load_graph():
+    """Import every module in ``MODULES`` so all nodes are registered."""
+    for module in MODULES:
+        importlib.import_module(module)
+    return NODES
+
+
+def node(name):
+    if name not in NODES:
+        load_graph()
+    try:
+        return NODES[name]
+    except KeyError:
+        raise KeyError(f"unknown artifact {name!r}") from None
+
+
+# ─── FINGERPRINTS ──────────────────────────────────────────────────────────────
+def fingerprint_of(name, params=None):
+    """
+    Fingerprint of ``name`` over its inputs, build parameters (``params``,
+    default: the registered ones) and, recursively, its dependencies.
+    """
+    n = node(name)
+    params = n.params if params is None else params
+    extra = {} if params is None else {"params": params}
+    return fingerprint(n.inputs, deps={dep: fingerprint_of(dep) for dep in n.deps}, **extra)
+
+
+def is_stale(name):
+    meta = read_meta(name)
+    return meta is None or meta["fingerprint"] != fingerprint_of(name)
+
+
+def order(targets=None):
+    """``targets`` (default: every node) and their dependencies, dependencies first."""
+    names = list(targets) if targets else list(load_graph())
+    done, visiting, out = set(), set(), []
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"dependency cycle through {name!r}")
+        visiting.add(name)
+        for dep in node(name).deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        out.append(name)
+
+    for name in names:
+        visit(name)
+    return out
+
+
+def downstream(paths):
+    """Nodes that read any of ``paths``, plus every node derived from them."""
+    paths = {Path(p).resolve() for p in paths}
+    graph = load_graph()
+    hit = {name for name, n in graph.items() if any(Path(p).resolve() in paths for p in n.inputs)}
+    for name in order():  # dependencies come first, so one pass propagates
+        if any(dep in hit for dep in graph[name].deps):
+            hit.add(name)
+    return [name for name in order() if name in hit]
+
+
+# ─── LOAD / SAVE ───────────────────────────────────────────────────────────────
+def save(name, frames, params=None, **meta):
+    """
+    Store the frames of node ``name`` under its current fingerprint.
+
+    ``params`` are the build parameters actually used (recorded in the meta);
+    when they differ from the registered defaults the artifact is saved as
+    stale, so ``load`` rebuilds it with the defaults.
+    """
+    if params is not None:
+        meta["params"] = params
+    save_artifact(name, frames, fingerprint_of(name, params), **meta)
+
+
+def load(name):
+    """``(frames, meta)`` of node ``name``, rebuilding it (and stale dependencies) if needed."""
+    return load_or_build(name, fingerprint_of(name), node(name).build)
+
+
+def _build(name, force):
+    start = time.perf_counter()
+    if force:
+        with file_lock(ARTIFACTS_DIR / f".{name}.lock"):
+            node(name).build()
+        status = "built"
+    elif is_stale(name):
+        load(name)
+        status = "built"
+    else:
+        status = "fresh"
+    return {"node": name, "status": status, "seconds": time.perf_counter() - start}
+
+
+def build(targets=None, workers=WORKERS, force=False):
+    """
+    Bring ``targets`` (default: the whole graph) up to date.
+
+    A node starts as soon as all its dependencies are done, so independent
+    branches build concurrently. Returns one report row per node.
+    """
+    names = order(targets)
+    deps = {name: set(node(name).deps) for name in names}
+    report, done, running = [], set(), {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline") as pool:
+        while len(done) < len(names):
+            for name in names:
+                if name not in done and name not in running.values() and deps[name] <= done:
+                    running[pool.submit(_build, name, force)] = name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                report.append(future.result())
+                done.add(running.pop(future))
+    return report
+
+
+def status():
+    """``(node, fresh/stale/missing, dependencies)`` for every node."""
+    rows = []
+    for name in order():
+        meta = read_meta(name)
+        state = "missing" if meta is None else "stale" if meta["fingerprint"] != fingerprint_of(name) else "fresh"
+        rows.append((name, state, node(name).deps))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("targets", nargs="*", help="artifacts to build (default: all)")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    parser.add_argument("--status", action="store_true", help="only report each node's state")
+    args = parser.parse_args()
+    if args.status:
+        for name, state, deps in status():
+            print(f"{name:<28} {state:<8} {', '.join(deps)}")
+        return
+    start = time.perf_counter()
+    report = build(args.targets or None, args.workers, args.force)
+    for row in report:
+        print(f"{row['node']:<28} {row['status']:<6} {row['seconds']:>7.2f}s")
+    built = sum(row["status"] == "built" for row in report)
+    print(f"{built}/{len(report)} artifacts rebuilt in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    # Nodes register on ``utils.pipeline``, not on this ``__main__`` copy
+    from utils.pipeline import main
+
+    main()
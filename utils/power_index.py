@@ -0,0 +1,157 @@
+"""
+Weighted composite power index over the standardized 2024 strength table.
+
+``load_strength_matrix`` standardizes every metric of the strength table
+once per process (as ``create_strength_score`` does, so equal weights on
+``utils.predictions.METRICS`` reproduce the page's strength score). An
+``IndexBuilder`` then keeps the scores ``Z @ w`` of one weight vector:
+
+- changing one weight by ``d`` adds ``d * Z[:, j]`` to the scores, a rank-1
+  update of O(countries) instead of a full matrix product; a full product
+  is only taken when many weights change at once, and periodically to stop
+  rounding error from accumulating;
+- ``top(n)`` re-ranks with ``argpartition`` and sorts only those ``n``.
+
+Scores are reported divided by the total weight, i.e. as a weighted mean
+of z-scores::
+
+    python -m utils.power_index navy_strength=3 national_annual_defense_budgets=2 --top 10
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.datasets import read_dataset
+from utils.predictions import METRICS
+
+# Columns of the strength table that are rankings, not metrics
+EXCLUDE = ("rank", "pwr_index")
+# More changed weights than this and one matrix product is cheaper
+FULL_UPDATE_AFTER = 8
+# Recompute from scratch after this many rank-1 updates
+REFRESH_EVERY = 1000
+TOP_N = 10
+
+
+class StrengthMatrix:
+    """Standardized countries × metrics matrix of the 2024 strength table."""
+
+    def __init__(self, df):
+        numeric = df.select_dtypes(include="number").drop(columns=list(EXCLUDE), errors="ignore")
+        values = numeric.to_numpy(dtype=float)
+        scale = values.std(axis=0)
+        self.z = np.nan_to_num((values - values.mean(axis=0)) / np.where(scale == 0, 1.0, scale))
+        # Column-major, so a rank-1 update reads one contiguous column
+        self.z = np.asfortranarray(self.z)
+        self.columns = numeric.columns.tolist()
+        self.position = {c: j for j, c in enumerate(self.columns)}
+        self.countries = df["country"].astype(str).to_numpy()
+        self.codes = df["country_code"].astype(str).to_numpy()
+        self.gfp_rank = pd.to_numeric(df["rank"], errors="coerce").to_numpy()
+
+
+class IndexBuilder:
+    """Scores of one weight vector over a ``StrengthMatrix``, updated incrementally."""
+
+    def __init__(self, matrix, weights=None):
+        self.matrix = matrix
+        self.weights = np.zeros(len(matrix.columns))
+        self.scores = np.zeros(len(matrix.countries))
+        self.updates = 0
+        self.set_weights(weights or {m: 1.0 for m in METRICS if m in matrix.position})
+
+    def _vector(self, weights):
+        w = np.zeros(len(self.matrix.columns))
+        for metric, weight in weights.items():
+            w[self.matrix.position[metric]] = weight
+        return w
+
+    def set_weights(self, weights):
+        """Move to ``{metric: weight}`` (others 0); returns how many weights changed."""
+        w = self._vector(weights)
+        changed = np.flatnonzero(w != self.weights)
+        if len(changed) > FULL_UPDATE_AFTER or self.updates + len(changed) > REFRESH_EVERY:
+            self.scores = self.matrix.z @ w
+            self.updates = 0
+        else:
+            for j in changed:
+                self.scores += (w[j] - self.weights[j]) * self.matrix.z[:, j]
+            self.updates += len(changed)
+        self.weights = w
+        return len(changed)
+
+    def total_weight(self):
+        return np.abs(self.weights).sum()
+
+    def top_rows(self, n=TOP_N):
+        """Row positions of the ``n`` highest scores, best first."""
+        n = min(n, len(self.scores))
+        part = np.argpartition(-self.scores, n - 1)[:n]
+        return part[np.argsort(-self.scores[part], kind="stable")]
+
+    def top(self, n=TOP_N):
+        """The ``n`` highest-scoring countries, best first."""
+        best = self.top_rows(n)
+        n = len(best)
+        m = self.matrix
+        return pd.DataFrame({
+            "rank": np.arange(1, n + 1),
+            "country": m.countries[best],
+            "country_code": m.codes[best],
+            "score": self.scores[best] / (self.total_weight() or 1.0),
+            "gfp_rank": m.gfp_rank[best],
+        })
+
+    def all_scores(self):
+        """Every country's score, unsorted (for maps)."""
+        m = self.matrix
+        return pd.DataFrame({
+            "country": m.countries,
+            "country_code": m.codes,
+            "score": self.scores / (self.total_weight() or 1.0),
+        })
+
+
+@st.cache_resource
+def load_strength_matrix():
+    """Shared standardized strength matrix, built once per process."""
+    df, _ = read_dataset("strength_2024")
+    return StrengthMatrix(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("weights", nargs="*", help="metric=weight pairs (default: the strength score's metrics)")
+    parser.add_argument("--top", type=int, default=TOP_N)
+    args = parser.parse_args()
+    df, _ = read_dataset("strength_2024")
+    matrix = StrengthMatrix(df)
+    weights = {m: float(w) for m, w in (pair.split("=", 1) for pair in args.weights)} or None
+    builder = IndexBuilder(matrix, weights)
+    print(builder.top(args.top).to_string(index=False, float_format="{:.3f}".format))
+
+    # Time one slider step back and forth, incrementally and as a full product
+    base = {c: builder.weights[i] for i, c in enumerate(matrix.columns) if builder.weights[i]}
+    moved = next(iter(base))
+    steps = [{**base, moved: base[moved] + 0.5}, base]
+    rounds = 1000
+    start = time.perf_counter()
+    for i in range(rounds):
+        builder.set_weights(steps[i % 2])
+        builder.top_rows(args.top)
+    incremental = (time.perf_counter() - start) / rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        scores = matrix.z @ builder.weights
+        np.argsort(-scores)
+    full = (time.perf_counter() - start) / rounds
+    print(f"{len(matrix.countries)} countries x {len(matrix.columns)} metrics: "
+          f"weight change + top {args.top} in {incremental * 1e6:.0f} µs "
+          f"(full product + sort {full * 1e6:.0f} µs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+2047 military-power projection used by the predictions page.
+
+A composite strength score (standardized mean of seven 2024 metrics) is
+projected forward with each country's defence-budget growth slope over
+2000–2020, then adjusted by the GFP PowerIndex.
+
+The scores and slopes do not depend on the target year, so they are the
+fitted model: the ``predictions`` node of the artifact graph
+(``utils.pipeline``). It stores the scaler's per-metric mean and scale,
+the growth slopes and the final scores, with ``MODEL_VERSION``, the
+fingerprints of the datasets it was trained on and the training time in
+its metadata. Projecting the scores to a year is cheap and done on load.
+
+The page never fits: it reads the stored model even when the data has
+changed since (and says so), and fits only if no compatible model exists
+yet. Training is a separate step, run by the data watcher, by
+``python -m utils.pipeline`` or directly::
+
+    python -m utils.predictions            # retrain if the inputs changed
+    python -m utils.predictions --force
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import pipeline
+from utils.artifacts import load_artifact, read_meta
+from utils.datasets import read_dataset
+from utils.lazy import lazy_import
+
+preprocessing = lazy_import("sklearn.preprocessing")
+linear_model = lazy_import("sklearn.linear_model")
+
+ARTIFACT = "predictions"
+# Bump when the stored model's frames or method change; older models are refitted
+MODEL_VERSION = 2
+DEPS = ["dataset_strength_2024", "dataset_defence_budget"]
+METRICS = [
+    'total_national_populations',
+    'active_service_military_manpower',
+    'total_military_aircraft_strength',
+    'total_combat_tank_strength',
+    'navy_strength',
+    'national_annual_defense_budgets',
+    'purchasing_power_parities'
+]
+# Budget years the growth slopes are fitted over
+GROWTH_YEARS = range(2000, 2021)
+
+
+def create_strength_score(df):
+    """Compute a composite strength score from selected metrics; also returns the scaler parameters."""
+    metrics = METRICS
+    for m in metrics:
+        if m in df.columns:
+            df[m] = pd.to_numeric(df[m], errors='coerce')
+    df_clean = df.dropna(subset=[m for m in metrics if m in df.columns])
+    scaler = preprocessing.StandardScaler()
+    scaled = scaler.fit_transform(df_clean[metrics])
+    sdf = pd.DataFrame(scaled, columns=metrics)
+    sdf['strength_score'] = sdf.mean(axis=1)
+    sdf['country'] = df_clean['country'].values
+    sdf['pwr_index'] = pd.to_numeric(df_clean['pwr_index'], errors='coerce')
+    params = pd.DataFrame({'metric': metrics, 'mean': scaler.mean_, 'scale': scaler.scale_})
+    return sdf.sort_values('strength_score', ascending=False), params
+
+
+def analyze_growth_trajectory(strength_df, budget_df):
+    """Estimate budget growth slopes as growth indicators."""
+    growth = []
+    for c in strength_df['country']:
+        subset = budget_df[budget_df['Country Name'] == c]
+        years = [str(y) for y in GROWTH_YEARS if str(y) in subset.columns]
+        if subset.empty or len(years) < 5:
+            growth.append(0)
+        else:
+            vals = subset[years].values.flatten().astype(float)
+            idx = np.arange(len(vals))[~np.isnan(vals)].reshape(-1,1)
+            y = vals[~np.isnan(vals)]
+            model = linear_model.LinearRegression().fit(idx, y)
+            growth.append(model.coef_[0])
+    strength_df['growth_slope'] = growth
+    # normalize
+    gs = strength_df['growth_slope']
+    strength_df['growth_norm'] = (gs - gs.min())/(gs.max()-gs.min() + 1e-9)
+    return strength_df
+
+
+def predict_future(df, target_year=2047):
+    years_proj = target_year - 2024
+    # Projected strength = current + growth impact
+    df['projected_strength'] = df['strength_score'] + df['growth_norm'] * (years_proj/5)
+    # Combine with PWR index
+    df['projection_score'] = df['projected_strength'] - 0.1 * df['pwr_index']
+    return df.sort_values('projection_score', ascending=False)
+
+
+# ─── TRAINING ──────────────────────────────────────────────────────────────────
+def build_predictions():
+    """Fit the scaler and growth slopes and store them with the scores."""
+    start = time.perf_counter()
+    military_strength, _ = read_dataset("strength_2024")
+    defense_budget, _ = read_dataset("defence_budget")
+    strength, scaler = create_strength_score(military_strength)
+    strength = analyze_growth_trajectory(strength, defense_budget)
+    pipeline.save(
+        ARTIFACT,
+        {"strength": strength, "scaler": scaler, "slopes": strength[["country", "growth_slope", "growth_norm"]]},
+        model_version=MODEL_VERSION,
+        inputs={dep: pipeline.fingerprint_of(dep) for dep in DEPS},
+        trained_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        fit_seconds=round(time.perf_counter() - start, 3),
+    )
+
+
+pipeline.register(ARTIFACT, build_predictions, deps=DEPS)
+
+
+# ─── LOADING ───────────────────────────────────────────────────────────────────
+def load_model():
+    """``(frames, meta)`` of the stored model; fits only if there is no compatible one."""
+    loaded = load_artifact(ARTIFACT)
+    if loaded is None or loaded[1].get("model_version") != MODEL_VERSION:
+        return pipeline.load(ARTIFACT)
+    return loaded
+
+
+def model_info():
+    """The stored model's metadata plus ``stale``: whether its inputs have changed since."""
+    meta = read_meta(ARTIFACT) or {}
+    return {**meta, "stale": meta.get("fingerprint") != pipeline.fingerprint_of(ARTIFACT)}
+
+
+def load_predictions(target_year=2047):
+    """``(strength, future)``: current scores and the projection ranking."""
+    meta = read_meta(ARTIFACT)
+    return _load_predictions(meta and meta["fingerprint"], target_year)
+
+
+@st.cache_data
+def _load_predictions(model_fingerprint, target_year):
+    frames, _ = load_model()
+    strength = frames["strength"]
+    future = predict_future(strength, target_year)
+    return strength, future
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the 2047 prediction model.")
+    parser.add_argument("--force", action="store_true", help="retrain even if the inputs are unchanged")
+    args = parser.parse_args()
+    report = pipeline.build([ARTIFACT], force=args.force)
+    frames, meta = load_artifact(ARTIFACT)
+    print(frames["scaler"].to_string(index=False))
+    slopes = frames["slopes"]["growth_slope"]
+    print(f"{len(frames['strength'])} countries; growth slopes {slopes.min():.3f} .. {slopes.max():.3f}")
+    row = report[-1]
+    print(f"model v{meta['model_version']} {meta['fingerprint']} {row['status']} in {row['seconds']:.2f}s "
+          f"(trained {meta['trained_at']})")
+
+
+if __name__ == "__main__":
+    # The node registers on ``utils.predictions``, not on this ``__main__`` copy
+    from utils.predictions import main
+
+    main()
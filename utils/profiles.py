@@ -0,0 +1,139 @@
+"""
+Materialized per-country profile table keyed by ISO3.
+
+Joins the strength tables, budget and expenditure histories, trade totals
+with India and defence-company revenue into one row per country, so a
+profile view is a single ``.loc`` lookup instead of a scan per dataset.
+Built offline and stored as an artifact::
+
+    python -m utils.profiles
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import pipeline
+from utils.budget import BUDGET_PATH
+from utils.countries import INDEX_PATH, canonical_name, to_iso3
+from utils.paths import DATA_DIR
+from utils.stats import nanmean
+
+ARTIFACT = "country_profiles"
+MILITARY_PATH = DATA_DIR / "military_data.csv"
+STRENGTH_PATH = DATA_DIR / "2024_military_strength_by_country.csv"
+EXPENDITURE_PATH = DATA_DIR / "Military_Expenditure_final_rounded.xlsx"
+TRADE_PATH = DATA_DIR / "exports_imports_cleaned.csv"
+COMPANIES_PATH = DATA_DIR / "updated_defense_companies_2005_2020.csv"
+INPUTS = (MILITARY_PATH, STRENGTH_PATH, BUDGET_PATH, EXPENDITURE_PATH, TRADE_PATH, COMPANIES_PATH, INDEX_PATH)
+
+# Columns taken from the 2024 strength table (the rest overlap military_data)
+STRENGTH_COLUMNS = {
+    "pwr_index": "GFP PowerIndex",
+    "rank": "GFP Rank",
+    "capital_city": "Capital",
+    "total_national_populations": "Population (2024)",
+    "navy_strength": "Navy Strength",
+}
+
+
+def _year_columns(df):
+    return sorted((c for c in df.columns if str(c).isdigit()), key=int)
+
+
+def _history(df, key, prefix):
+    """Latest value/year, 10-year mean and full series per ISO3."""
+    years = _year_columns(df)
+    values = df[years].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    has = np.isfinite(values)
+    any_value = has.any(axis=1)
+    last = values.shape[1] - 1 - np.argmax(has[:, ::-1], axis=1)
+    year_values = np.array(years, dtype=float)
+    out = pd.DataFrame({
+        "iso3": key.to_numpy(),
+        f"{prefix}_latest": np.where(any_value, values[np.arange(len(values)), last], np.nan),
+        f"{prefix}_latest_year": np.where(any_value, year_values[last], np.nan),
+        f"{prefix}_avg_10y": nanmean(values[:, -10:], axis=1),
+        f"{prefix}_history": list(values),
+    })
+    out.attrs["years"] = [int(y) for y in years]
+    return out.dropna(subset=["iso3"]).drop_duplicates("iso3")
+
+
+def build_profiles():
+    """Join every dataset by ISO3 into one profile frame and store it."""
+    military = pd.read_csv(MILITARY_PATH)
+    military.insert(0, "iso3", to_iso3(military["country"]).fillna(military["country_code"]).to_numpy())
+
+    strength = pd.read_csv(STRENGTH_PATH)
+    strength["iso3"] = to_iso3(strength["country"]).fillna(strength["country_code"]).to_numpy()
+    strength = strength[["iso3", *STRENGTH_COLUMNS]].rename(columns=STRENGTH_COLUMNS)
+
+    budget = pd.read_csv(BUDGET_PATH)
+    budget_hist = _history(budget, to_iso3(budget["Country Name"]), "budget_gdp")
+
+    exp = pd.read_excel(EXPENDITURE_PATH)
+    exp = exp[(exp["Indicator Name"] == "Military expenditure (current USD)") & (exp["Type"] == "Country")]
+    exp_hist = _history(exp, to_iso3(exp["Name"]), "expenditure_usd")
+
+    trade = pd.read_csv(TRADE_PATH)
+    trade["iso3"] = to_iso3(trade["country"]).to_numpy()
+    latest_fy = trade["financial_year(start)"].max()
+    trade_tot = trade.groupby("iso3").agg(
+        india_exports_total=("export", "sum"),
+        india_imports_total=("import", "sum"),
+        india_trade_balance_total=("trade_balance", "sum"),
+    )
+    trade_tot["india_trade_latest"] = (
+        trade[trade["financial_year(start)"] == latest_fy].groupby("iso3")["total_trade"].sum()
+    )
+    trade_tot["india_trade_latest_fy"] = latest_fy
+
+    companies = pd.read_csv(COMPANIES_PATH)
+    companies["iso3"] = to_iso3(companies["Country"]).to_numpy()
+    latest_year = companies["Year"].max()
+    comp_latest = companies[companies["Year"] == latest_year].groupby("iso3").agg(
+        companies_latest=("Company", "nunique"),
+        company_defense_revenue_latest=("Defense_Revenue_From_A_Year_Ago", "sum"),
+    )
+    comp_latest["companies_latest_year"] = latest_year
+
+    profiles = (
+        military.set_index("iso3")
+        .join(strength.drop_duplicates("iso3").set_index("iso3"), how="outer")
+        .join(budget_hist.set_index("iso3"), how="left")
+        .join(exp_hist.set_index("iso3"), how="left")
+        .join(trade_tot, how="left")
+        .join(comp_latest, how="left")
+    )
+    profiles = profiles[profiles.index.notna()]
+    profiles["name"] = [canonical_name(c) for c in profiles.index]
+    profiles["country"] = profiles["country"].fillna(profiles["name"])
+    profiles.index.name = "iso3"
+    profiles = profiles.sort_values("country")
+
+    meta = {"budget_years": budget_hist.attrs["years"], "expenditure_years": exp_hist.attrs["years"]}
+    pipeline.save(ARTIFACT, {"profiles": profiles}, **meta)
+    return profiles, meta
+
+
+pipeline.register(ARTIFACT, build_profiles, inputs=INPUTS)
+
+
+def load_profiles():
+    """``(profiles, meta)``; the frame is shared and must not be mutated."""
+    return _load_profiles(pipeline.fingerprint_of(ARTIFACT))
+
+
+@st.cache_resource
+def _load_profiles(artifact_fingerprint):
+    frames, meta = pipeline.load(ARTIFACT)
+    return frames["profiles"], meta
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    profiles, _ = build_profiles()
+    print(f"built {len(profiles)} country profiles x {profiles.shape[1]} fields "
+          f"in {time.perf_counter() - start:.2f}s")
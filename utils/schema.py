@@ -0,0 +1,177 @@
+"""
+Declarative schemas for the datasets: what each file must contain, how its
+columns are typed, and the compact in-memory representation.
+
+Each dataset is checked once, when ``utils.datasets`` builds its columnar
+cache (a Parquet artifact), rather than by every page on every load:
+
+- ``required`` columns must be present, or the build fails with
+  ``SchemaError``;
+- ``years`` (first, last) names the year-wide value columns; any that are
+  missing are added empty and reported as a warning, and all of them are
+  coerced to numbers;
+- ``numeric`` columns are coerced to numbers (unparseable cells become NaN);
+- ``categorical`` and ``keep`` drive ``compact``: constant columns are
+  dropped unless the schema declares them (in any of the lists above or
+  ``keep``), integers are downcast, floats become float32 where that is
+  lossless, and repetitive name columns become categoricals.
+
+To see the effect on memory::
+
+    python -m utils.schema
+"""
+import numpy as np
+import pandas as pd
+
+# Per dataset: columns that must exist, value columns to coerce to numbers,
+# name columns worth a categorical, and columns that must be kept even if
+# constant (pages select or filter on them by name)
+SCHEMAS = {
+    "defence_budget": {
+        "required": ["Country Name", "Country Code"],
+        "years": (1960, 2020),
+        "categorical": [],
+        "keep": ["Country Name", "Country Code"],
+    },
+    "military": {
+        "required": ["country", "country_code", "Active Personnel", "Defense Budget"],
+        "categorical": [],
+        "keep": ["country", "country_code"],
+    },
+    "strength_2024": {
+        "required": ["country", "country_code", "pwr_index", "rank"],
+        "categorical": [],
+        "keep": ["country", "country_code"],
+    },
+    "expenditure": {
+        "required": ["Name", "Code", "Type", "Indicator Name"],
+        "years": (1960, 2018),
+        "categorical": ["Type", "Indicator Name"],
+        "keep": ["Name", "Code", "Type", "Indicator Name"],
+    },
+    "trade": {
+        "required": ["country", "export", "import", "financial_year(start)"],
+        "numeric": ["export", "import", "total_trade", "trade_balance"],
+        "categorical": ["country", "financial_year(end)"],
+        "keep": ["country"],
+    },
+    "trade_events": {
+        "required": ["country", "year", "event_description"],
+        "categorical": ["country"],
+        "keep": ["country", "year", "event_description"],
+    },
+    "companies": {
+        "required": ["Year", "Company", "Country", "Defense_Revenue_From_A_Year_Ago"],
+        "numeric": ["Defense_Revenue_From_A_Year_Ago", "Total Revenue", "%of Revenue from Defence"],
+        "categorical": ["Country", "Company"],
+        "keep": ["Country", "Company", "Year"],
+    },
+}
+
+# Only convert when values repeat enough for the codes to pay off
+MAX_CATEGORY_RATIO = 0.5
+
+
+def _downcast_int(col):
+    # Never below int32: page code multiplies and sums these columns
+    # without upcasting, and int8/int16 would silently overflow
+    small = pd.to_numeric(col, downcast="integer")
+    return small if small.dtype.itemsize >= 4 else col.astype(np.int32)
+
+
+def _downcast_float(col):
+    small = col.astype(np.float32)
+    same = (small.astype(np.float64) == col) | col.isna()
+    return small if same.all() else col
+
+
+class SchemaError(ValueError):
+    """A dataset does not match its declared schema."""
+
+
+def year_columns(name):
+    """The year-wide value columns declared for ``name`` (as strings)."""
+    first, last = SCHEMAS[name]["years"]
+    return [str(y) for y in range(first, last + 1)]
+
+
+def _to_numeric(df, columns, name, warnings):
+    for col in columns:
+        values = pd.to_numeric(df[col], errors="coerce")
+        lost = int(values.isna().sum() - df[col].isna().sum())
+        if lost:
+            warnings.append(f"{name}: {lost} non-numeric value(s) in '{col}' treated as missing")
+        df[col] = values
+
+
+def conform(name, df):
+    """
+    Validate ``df`` against the schema of dataset ``name`` and coerce it.
+
+    Returns ``(frame, warnings)`` with the frame in compact dtypes; raises
+    ``SchemaError`` if a required column is missing.
+    """
+    spec = SCHEMAS[name]
+    missing = [c for c in spec.get("required", []) if c not in df.columns]
+    if missing:
+        raise SchemaError(f"{name}: missing required column(s) {', '.join(map(repr, missing))}")
+    df = df.copy()
+    warnings = []
+    numeric = [c for c in spec.get("numeric", []) if c in df.columns]
+    if "years" in spec:
+        years = year_columns(name)
+        absent = [y for y in years if y not in df.columns]
+        if absent:
+            warnings.append(f"{name}: missing year columns {', '.join(absent)} added empty")
+            for y in absent:
+                df[y] = np.nan
+        numeric += years
+    _to_numeric(df, numeric, name, warnings)
+    # Columns the schema declares stay even when constant or empty: pages index them by name
+    declared = [*spec.get("required", []), *numeric, *spec["categorical"], *spec["keep"]]
+    return compact(df, spec["categorical"], declared), warnings
+
+
+def compact(df, categorical=(), keep=()):
+    """Copy of ``df`` with the compact dtypes described in the module docstring."""
+    out = {}
+    for name in df.columns:
+        col = df[name]
+        if name not in keep and col.nunique(dropna=False) <= 1:
+            continue
+        if pd.api.types.is_integer_dtype(col) and not isinstance(col.dtype, pd.CategoricalDtype):
+            col = _downcast_int(col)
+        elif pd.api.types.is_float_dtype(col):
+            col = _downcast_float(col)
+        elif name in categorical and col.nunique() <= MAX_CATEGORY_RATIO * len(col):
+            col = col.astype("category")
+        out[name] = col
+    return pd.DataFrame(out, index=df.index)
+
+
+def memory(df):
+    """Deep memory usage in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report():
+    """``(dataset, raw bytes, compact bytes, dropped columns)`` per dataset."""
+    from utils.datasets import read_raw
+
+    rows = []
+    for name in SCHEMAS:
+        raw = read_raw(name)
+        small, _ = conform(name, raw)
+        dropped = [c for c in raw.columns if c not in small.columns]
+        rows.append((name, memory(raw), memory(small), dropped))
+    return rows
+
+
+if __name__ == "__main__":
+    rows = memory_report()
+    for name, before, after, dropped in rows:
+        note = f"  dropped: {', '.join(dropped)}" if dropped else ""
+        print(f"{name:<16} {before / 1024:>8.1f} KB -> {after / 1024:>8.1f} KB ({after / before:>4.0%}){note}")
+    total_before = sum(r[1] for r in rows)
+    total_after = sum(r[2] for r in rows)
+    print(f"{'total':<16} {total_before / 1024:>8.1f} KB -> {total_after / 1024:>8.1f} KB ({total_after / total_before:.0%})")
@@ -0,0 +1,190 @@
+"""
+Monte Carlo uncertainty for the 2047 ranking of ``utils.predictions``.
+
+``predict_future`` turns point estimates into one ordering. Here each draw
+perturbs both of its inputs and ranks again:
+
+- growth slopes by residual bootstrap: every country's 2000–2020 budget
+  residuals are resampled onto its fitted line and the slope refitted
+  (for least squares that is the fitted slope plus the resampled
+  residuals' own slope, one weighted sum per country);
+- the seven strength metrics by multiplicative log-normal noise
+  (``METRIC_NOISE``), re-standardized across countries per draw.
+
+Draws are processed as (draws × countries) arrays in chunks of ``CHUNK``,
+each chunk with its own seed, so results do not depend on how chunks are
+split across a process pool. Each country gets its rank distribution and
+the probability of finishing in the top ten::
+
+    python -m utils.simulation --draws 10000 --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.budget import BUDGET_PATH
+from utils.datasets import SCHEMA_SOURCE, STRENGTH_PATH, read_dataset
+from utils.diskcache import disk_cached
+from utils.predictions import GROWTH_YEARS, METRICS
+
+DRAWS = 10000
+CHUNK = 1000
+METRIC_NOISE = 0.1
+TOP_N = 10
+TARGET_YEAR = 2047
+MODULE_SOURCE = Path(__file__)
+
+
+# ─── INPUTS ────────────────────────────────────────────────────────────────────
+def _trend_fit(block):
+    """Per-row slope over the observed columns, with the pieces a bootstrap needs."""
+    m = np.isfinite(block)
+    n = m.sum(axis=1)
+    # Position among observed years, as the page's LinearRegression sees it
+    t = np.where(m, np.cumsum(m, axis=1) - 1, 0).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tbar = t.sum(axis=1) / n
+        ybar = np.where(m, block, 0).sum(axis=1) / n
+        dt = np.where(m, t - tbar[:, None], 0)
+        sxx = (dt ** 2).sum(axis=1)
+        slope = (dt * np.where(m, block - ybar[:, None], 0)).sum(axis=1) / sxx
+        resid = np.where(m, block - ybar[:, None] - slope[:, None] * dt, np.nan)
+    fitted = n >= 2
+    slope = np.where(fitted, slope, 0.0)
+    # Weights turning resampled residuals into a slope: sum(w * e)
+    weights = np.where(fitted[:, None], dt / np.where(fitted, sxx, 1)[:, None], 0.0)
+    # Each row's residuals packed to the left, for sampling by position
+    order = np.argsort(~m, axis=1, kind="stable")
+    packed = np.take_along_axis(np.where(m & fitted[:, None], resid, 0.0), order, axis=1)
+    return slope, weights, packed, n
+
+
+def model_inputs():
+    """Countries, raw metrics, PowerIndex and budget-trend fits, in the page's order."""
+    strength, _ = read_dataset("strength_2024")
+    budget, _ = read_dataset("defence_budget")
+    df = strength.copy()
+    for m in METRICS:
+        df[m] = pd.to_numeric(df[m], errors="coerce")
+    df = df.dropna(subset=METRICS)
+    years = [str(y) for y in GROWTH_YEARS if str(y) in budget.columns]
+    block = (
+        budget.drop_duplicates("Country Name").set_index("Country Name")[years]
+        .reindex(df["country"]).to_numpy(dtype=float)
+    )
+    slope, weights, packed, n = _trend_fit(block)
+    return {
+        "countries": df["country"].astype(str).to_numpy(),
+        "metrics": df[METRICS].to_numpy(dtype=float),
+        "pwr_index": pd.to_numeric(df["pwr_index"], errors="coerce").to_numpy(dtype=float),
+        "slope": slope,
+        "weights": weights,
+        "residuals": packed,
+        "observed": n,
+    }
+
+
+# ─── SIMULATION ────────────────────────────────────────────────────────────────
+def projection_scores(metrics, slope, pwr_index, target_year=TARGET_YEAR):
+    """``predict_future``'s score for stacked draws: metrics (..., C, M), slope (..., C)."""
+    scaled = (metrics - metrics.mean(axis=-2, keepdims=True)) / metrics.std(axis=-2, keepdims=True)
+    low, high = slope.min(axis=-1, keepdims=True), slope.max(axis=-1, keepdims=True)
+    growth_norm = (slope - low) / (high - low + 1e-9)
+    projected = scaled.mean(axis=-1) + growth_norm * ((target_year - 2024) / 5)
+    return projected - 0.1 * pwr_index
+
+
+def ranks(scores):
+    """1-based rank of every column within each row, best score first."""
+    order = np.argsort(-scores, axis=-1, kind="stable")
+    out = np.empty_like(order)
+    np.put_along_axis(out, order, np.arange(1, scores.shape[-1] + 1), axis=-1)
+    return out
+
+
+def _chunk(inputs, draws, seed, target_year, metric_noise):
+    """Rank counts (countries × ranks) over ``draws`` draws."""
+    rng = np.random.default_rng(seed)
+    n_countries, n_years = inputs["weights"].shape
+    # Residual bootstrap: position j of each row draws one of its n observed residuals
+    pick = (rng.random((draws, n_countries, n_years)) * np.maximum(inputs["observed"], 1)[:, None]).astype(int)
+    resampled = np.take_along_axis(
+        np.broadcast_to(inputs["residuals"], (draws, n_countries, n_years)), pick, axis=-1
+    )
+    slope = inputs["slope"] + (inputs["weights"] * resampled).sum(axis=-1)
+    metrics = inputs["metrics"] * np.exp(rng.normal(0, metric_noise, (draws, *inputs["metrics"].shape)))
+    r = ranks(projection_scores(metrics, slope, inputs["pwr_index"], target_year))
+    flat = np.arange(n_countries) * n_countries + (r - 1)
+    return np.bincount(flat.ravel(), minlength=n_countries * n_countries).reshape(n_countries, n_countries)
+
+
+def _run_chunk(draws, seed, target_year, metric_noise):
+    return _chunk(model_inputs(), draws, seed, target_year, metric_noise)
+
+
+# The chunks and their seeds do not depend on ``workers``, so neither does the result
+@disk_cached(inputs=[STRENGTH_PATH, BUDGET_PATH, SCHEMA_SOURCE, MODULE_SOURCE], ignore=("workers",))
+def simulate(draws=DRAWS, target_year=TARGET_YEAR, metric_noise=METRIC_NOISE, seed=0, workers=1):
+    """
+    ``(summary, counts)`` over ``draws`` simulated rankings.
+
+    ``summary`` has one row per country: the deterministic rank, mean and
+    median rank, a 90% rank interval and ``p_top10``, sorted by the latter.
+    ``counts`` is countries × ranks. ``workers > 1`` spreads the chunks
+    over a process pool.
+    """
+    inputs = model_inputs()
+    sizes = [min(CHUNK, draws - start) for start in range(0, draws, CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_run_chunk, sizes, seeds, [target_year] * len(sizes), [metric_noise] * len(sizes))
+            counts = sum(parts)
+    else:
+        counts = sum(_chunk(inputs, size, s, target_year, metric_noise) for size, s in zip(sizes, seeds))
+
+    countries = inputs["countries"]
+    counts = pd.DataFrame(counts, index=countries, columns=np.arange(1, len(countries) + 1))
+    cdf = counts.cumsum(axis=1).to_numpy() / draws
+    rank_at = lambda q: (cdf >= q).argmax(axis=1) + 1  # noqa: E731
+    point = ranks(projection_scores(inputs["metrics"], inputs["slope"], inputs["pwr_index"], target_year))
+    summary = pd.DataFrame({
+        "country": countries,
+        "rank": point,
+        "mean_rank": counts.to_numpy() @ counts.columns.to_numpy() / draws,
+        "median_rank": rank_at(0.5),
+        "rank_p05": rank_at(0.05),
+        "rank_p95": rank_at(0.95),
+        "p_top10": counts.iloc[:, :TOP_N].sum(axis=1).to_numpy() / draws,
+    })
+    return summary.sort_values(["p_top10", "mean_rank"], ascending=[False, True]).reset_index(drop=True), counts
+
+
+@st.cache_data
+def load_simulation(draws=DRAWS, target_year=TARGET_YEAR):
+    """Simulation for the page; computed once, then read from the disk cache."""
+    return simulate(draws, target_year)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--draws", type=int, default=DRAWS)
+    parser.add_argument("--target-year", type=int, default=TARGET_YEAR)
+    parser.add_argument("--noise", type=float, default=METRIC_NOISE, help="log-sd of the metric perturbation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    start = time.perf_counter()
+    summary, _ = simulate(args.draws, args.target_year, args.noise, args.seed, args.workers)
+    print(summary.head(15).to_string(index=False, float_format="{:.3f}".format))
+    print(f"{args.draws} draws x {len(summary)} countries in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
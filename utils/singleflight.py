@@ -0,0 +1,82 @@
+"""
+Single-flight coalescing for expensive loads.
+
+Concurrent callers asking for the same key wait on one in-flight
+computation and share its result (or exception) instead of each running
+it. ``st.cache_data``/``st.cache_resource`` already hold a per-key compute
+lock inside one process; this covers what they do not: plain functions
+behind ``lru_cache`` and artifact builds, which ``file_lock`` also
+serialises across server processes and the batch CLIs.
+"""
+import functools
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process coalescing only
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Group of keyed calls; at most one runs per key at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+def single_flight(fn):
+    """Decorator: coalesce concurrent calls with equal (hashable) arguments."""
+    group = SingleFlight()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return group.do((args, tuple(sorted(kwargs.items()))), fn, *args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on ``path`` shared by every process on the host."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
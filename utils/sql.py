@@ -0,0 +1,238 @@
+"""
+Embedded SQL engine over the files in ``data/``.
+
+Pages can push filters, projections and aggregations down to SQL instead of
+masking, grouping and melting full in-memory frames. DuckDB is used when it
+is installed: CSVs are exposed as views over the files themselves, so a
+query scans only the columns and rows it needs. Without DuckDB the same
+tables live in a SQLite database under ``artifacts/`` with indexes on the
+usual filter keys, rebuilt whenever a data file changes and shared by
+every process.
+
+Tables (year-wide sheets are stored long, one row per country and year):
+
+- ``companies``: ``updated_defense_companies_2005_2020.csv`` as is
+- ``trade``: ``exports_imports_cleaned.csv`` as is
+- ``military``: ``military_data.csv`` as is
+- ``strength``: ``2024_military_strength_by_country.csv`` as is
+- ``budget``: country, code, year, value (defence budget, % of GDP)
+- ``expenditure``: name, code, type, indicator, year, value
+
+Build the SQLite file ahead of time with ``python -m utils.sql``.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+from utils.artifacts import fingerprint
+from utils.budget import BUDGET_PATH
+from utils.datasets import COMPANIES_PATH, EXPENDITURE_PATH, MILITARY_PATH, STRENGTH_PATH, TRADE_PATH
+from utils.paths import ARTIFACTS_DIR
+from utils.singleflight import file_lock
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+ENGINE = "duckdb" if duckdb is not None else "sqlite"
+DB_PATH = ARTIFACTS_DIR / "datasets.sqlite"
+
+# Tables read straight from CSV
+CSV_TABLES = {
+    "companies": COMPANIES_PATH,
+    "trade": TRADE_PATH,
+    "military": MILITARY_PATH,
+    "strength": STRENGTH_PATH,
+}
+INPUTS = (*CSV_TABLES.values(), BUDGET_PATH, EXPENDITURE_PATH)
+INDEXES = {
+    "companies": [("Year", "Country"), ("Company",)],
+    "trade": [("country",), ("financial_year(start)",)],
+    "budget": [("year", "country"), ("country",)],
+    "expenditure": [("indicator", "type", "year"), ("name",)],
+}
+
+
+def _year_columns(df):
+    return [c for c in df.columns if str(c).isdigit()]
+
+
+def _long(df, ids, names):
+    """Melt a year-wide sheet to ``(*names, year, value)`` rows."""
+    out = df.melt(id_vars=ids, value_vars=_year_columns(df), var_name="year", value_name="value")
+    out["year"] = out["year"].astype(int)
+    out["value"] = pd.to_numeric(out["value"], errors="coerce")
+    return out.rename(columns=dict(zip(ids, names))).dropna(subset=["value"])
+
+
+def long_tables():
+    """The reshaped tables both engines register from pandas."""
+    budget = _long(pd.read_csv(BUDGET_PATH), ["Country Name", "Country Code"], ["country", "code"])
+    expenditure = _long(
+        pd.read_excel(EXPENDITURE_PATH),
+        ["Name", "Code", "Type", "Indicator Name"],
+        ["name", "code", "type", "indicator"],
+    )
+    return {"budget": budget, "expenditure": expenditure}
+
+
+# ─── SQLITE ────────────────────────────────────────────────────────────────────
+def build_database(path=DB_PATH):
+    """Write every table (plus indexes) to a fresh SQLite file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".datasets.", suffix=".sqlite", dir=os.path.dirname(path))
+    os.close(fd)
+    conn = sqlite3.connect(tmp)
+    try:
+        tables = {name: pd.read_csv(p) for name, p in CSV_TABLES.items()}
+        tables.update(long_tables())
+        for name, df in tables.items():
+            df.to_sql(name, conn, index=False)
+        for name, indexes in INDEXES.items():
+            for cols in indexes:
+                quoted = ", ".join(f'"{c}"' for c in cols)
+                conn.execute(f'CREATE INDEX "{name}_{"_".join(cols)}" ON {name} ({quoted})')
+        conn.execute("CREATE TABLE _meta (fingerprint TEXT)")
+        conn.execute("INSERT INTO _meta VALUES (?)", (fingerprint(INPUTS),))
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+def _database_fingerprint(path):
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return conn.execute("SELECT fingerprint FROM _meta").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+
+def _sqlite_database(input_fingerprint):
+    """
+    Path of a SQLite file matching ``input_fingerprint``, built if needed.
+
+    Not cached per process: data can return to an earlier fingerprint after
+    the file was rebuilt for another one, so the file itself is checked.
+    """
+    if _database_fingerprint(DB_PATH) != input_fingerprint:
+        with file_lock(ARTIFACTS_DIR / ".datasets.lock"):
+            if _database_fingerprint(DB_PATH) != input_fingerprint:
+                build_database()
+    return str(DB_PATH)
+
+
+_local = threading.local()
+
+
+def _sqlite_query(sql, params):
+    key = fingerprint(INPUTS)
+    # A rebuild replaces the file: a connection opened before it still reads
+    # the old, unlinked one, so reopen whenever the inputs' fingerprint moves
+    if getattr(_local, "key", None) != (os.getpid(), key):
+        old = getattr(_local, "conn", None)
+        if old is not None and getattr(_local, "pid", None) == os.getpid():
+            old.close()
+        path = _sqlite_database(key)
+        # Read-only: a rebuild never writes into the file it replaces
+        _local.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        _local.key, _local.pid = (os.getpid(), key), os.getpid()
+    return pd.read_sql_query(sql, _local.conn, params=params)
+
+
+# ─── DUCKDB ────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def _duckdb_connection(input_fingerprint):
+    con = duckdb.connect()
+    for name, path in CSV_TABLES.items():
+        con.execute(f"CREATE VIEW {name} AS SELECT * FROM read_csv_auto('{path}')")
+    for name, df in long_tables().items():
+        # Materialised so cursors (per-thread connections) see them too
+        con.register("_frame", df)
+        con.execute(f"CREATE TABLE {name} AS SELECT * FROM _frame")
+        con.unregister("_frame")
+    return con
+
+
+def _duckdb_query(sql, params):
+    # One cursor per call: DuckDB connections are not shared across threads
+    cursor = _duckdb_connection(fingerprint(INPUTS)).cursor()
+    try:
+        return cursor.execute(sql, list(params)).df()
+    finally:
+        cursor.close()
+
+
+def query(sql, params=()):
+    """Run ``sql`` (``?`` placeholders) against the dataset tables."""
+    if ENGINE == "duckdb":
+        return _duckdb_query(sql, params)
+    return _sqlite_query(sql, params)
+
+
+# ─── PUSHED-DOWN QUERIES ───────────────────────────────────────────────────────
+_COMPANY_MEASURES = {
+    "revenue": 'SUM("Defense_Revenue_From_A_Year_Ago")',
+    "companies": 'COUNT(DISTINCT "Company")',
+}
+
+
+@st.cache_data
+def top_countries_per_year(n, measure="revenue"):
+    """Each year's ``n`` countries with the highest company revenue or count."""
+    return query(f"""
+        WITH agg AS (
+            SELECT "Year", "Country", {_COMPANY_MEASURES[measure]} AS value
+            FROM companies GROUP BY "Year", "Country"
+        ), ranked AS (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY "Year" ORDER BY value DESC, "Country") AS rn
+            FROM agg
+        )
+        SELECT "Year", "Country", value FROM ranked WHERE rn <= ? ORDER BY "Year", value DESC
+    """, (int(n),))
+
+
+@st.cache_data
+def top_companies_by_country(year, n_countries, n_companies):
+    """Top companies by revenue within the year's top countries."""
+    return query("""
+        WITH by_company AS (
+            SELECT "Country", "Company", SUM("Defense_Revenue_From_A_Year_Ago") AS revenue
+            FROM companies WHERE "Year" = ? GROUP BY "Country", "Company"
+        ), countries AS (
+            SELECT "Country" FROM by_company GROUP BY "Country"
+            ORDER BY SUM(revenue) DESC LIMIT ?
+        ), ranked AS (
+            SELECT b.*, ROW_NUMBER() OVER (PARTITION BY b."Country" ORDER BY b.revenue DESC) AS rn
+            FROM by_company b JOIN countries c ON b."Country" = c."Country"
+        )
+        SELECT "Country", "Company", revenue FROM ranked WHERE rn <= ?
+    """, (int(year), int(n_countries), int(n_companies)))
+
+
+@st.cache_data
+def expenditure_totals(start, end, n, bottom=False, indicator="Military expenditure (current USD)"):
+    """Countries with the largest (or smallest positive) spend summed over ``start``–``end``."""
+    having = "HAVING SUM(value) > 0" if bottom else ""
+    order = "ASC" if bottom else "DESC"
+    return query(f"""
+        SELECT name, SUM(value) AS total FROM expenditure
+        WHERE indicator = ? AND type = 'Country' AND year BETWEEN ? AND ?
+        GROUP BY name {having} ORDER BY total {order} LIMIT ?
+    """, (indicator, int(start), int(end), int(n))).set_index("name")["total"]
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    build_database()
+    print(f"wrote {DB_PATH.name} in {time.perf_counter() - start:.2f}s (engine in use: {ENGINE})")
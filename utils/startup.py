@@ -0,0 +1,138 @@
+"""
+Cold-start profiler with a time budget per page.
+
+Each page runs once in a fresh interpreter (so no module or cache is warm)
+under ``python -X importtime`` and Streamlit's ``AppTest``. The report
+shows the total cold-start time, the time spent importing modules the page
+pulls in beyond Streamlit itself (grouped by top-level package), which of
+the heavy optional dependencies got loaded, and whether the page stayed
+within its budget::
+
+    python -m utils.startup                 # every page
+    python -m utils.startup pages/7_*.py    # selected pages
+
+Exits non-zero when a page fails or exceeds its budget.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+
+from utils.paths import ROOT_DIR
+
+# Cold-start budget in seconds (run + imports, excluding interpreter boot),
+# the slowest of three cold runs (noted beside each) plus half again, rounded up
+# to 0.5s. Re-measure with --json after changing what a page loads
+BUDGETS = {
+    "Home.py": 1.0,                             # 0.39s
+    "pages/1_Defence_Budget.py": 1.5,           # 0.89s
+    "pages/2_Military_Strength.py": 2.0,        # 1.25s
+    "pages/3_Trade_Data.py": 1.5,               # 0.99s
+    "pages/4_Defense_Companies.py": 3.0,        # 2.01s
+    "pages/5_Military_Expenditure.py": 1.5,     # 0.94s
+    "pages/6_Major_Conflicts.py": 1.5,          # 0.80s
+    "pages/7_Predictions_2047.py": 4.0,         # 2.36s
+    "pages/8_Acknowledgements.py": 1.0,         # 0.36s
+}
+DEFAULT_BUDGET = 3.0
+HEAVY = ("sklearn", "matplotlib", "seaborn", "pydeck", "geopy", "scipy", "openpyxl")
+MARKER = "utils.startup: page start"
+
+# Runs inside the child interpreter; Streamlit and AppTest are imported
+# before the marker so only the page's own imports are attributed to it
+_CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+import plotly.express, pandas
+print({marker!r}, file=sys.stderr, flush=True)
+start = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout=600).run()
+elapsed = time.perf_counter() - start
+from utils.lazy import IMPORT_TIMES
+print(json.dumps({{
+    "elapsed": elapsed,
+    "errors": [str(e.value)[:200] for e in at.exception],
+    "heavy": sorted(m for m in {heavy!r} if m in sys.modules),
+    "lazy": IMPORT_TIMES,
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Seconds of cumulative import time per top-level package after the marker."""
+    per_package = defaultdict(float)
+    started = False
+    for line in stderr.splitlines():
+        if line.startswith(MARKER):
+            started = True
+            continue
+        if not started or not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        # Nested imports are indented; only top-level ones carry the full cost
+        if len(name) - len(name.lstrip()) > 1:
+            continue
+        per_package[name.strip().split(".")[0]] += int(cumulative) / 1e6
+    return dict(per_package)
+
+
+def profile_page(page):
+    """Profile one page in a fresh interpreter and return its report."""
+    path = ROOT_DIR / page
+    code = _CHILD.format(root=str(ROOT_DIR), marker=MARKER, page=str(path), heavy=HEAVY)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode or not lines:
+        result = {"elapsed": float("nan"), "errors": [proc.stderr.strip().splitlines()[-1:]], "heavy": [], "lazy": {}}
+    else:
+        result = json.loads(lines[-1])
+    imports = parse_importtime(proc.stderr)
+    result.update(
+        page=page,
+        imports=imports,
+        import_total=sum(imports.values()),
+        budget=BUDGETS.get(page, DEFAULT_BUDGET),
+    )
+    result["ok"] = not result["errors"] and result["elapsed"] <= result["budget"]
+    return result
+
+
+def format_report(results):
+    rows = [f"{'page':<34} {'cold start':>10} {'imports':>8} {'budget':>7}  status  heavy deps"]
+    for r in results:
+        status = "ok" if r["ok"] else ("error" if r["errors"] else "OVER")
+        rows.append(
+            f"{r['page']:<34} {r['elapsed']:>9.2f}s {r['import_total']:>7.2f}s {r['budget']:>6.1f}s  "
+            f"{status:<6}  {', '.join(r['heavy']) or '-'}"
+        )
+        top = sorted(r["imports"].items(), key=lambda kv: -kv[1])[:4]
+        if top:
+            rows.append("    imports: " + ", ".join(f"{name} {secs:.2f}s" for name, secs in top))
+        for err in r["errors"]:
+            rows.append(f"    error: {err}")
+    return "\n".join(rows)
+
+
+def default_pages():
+    return ["Home.py"] + sorted(str(p.relative_to(ROOT_DIR)) for p in (ROOT_DIR / "pages").glob("*.py"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pages", nargs="*", help="page files relative to the repo root")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+    results = [profile_page(page) for page in args.pages or default_pages()]
+    print(json.dumps(results, indent=2) if args.json else format_report(results))
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
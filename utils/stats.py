@@ -0,0 +1,13 @@
+"""
+Small numeric helpers shared by the batch jobs.
+"""
+import warnings
+
+import numpy as np
+
+
+def nanmean(values, axis=None, **kwargs):
+    """``np.nanmean`` without the warning for all-NaN slices (they yield NaN)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.nanmean(values, axis=axis, **kwargs)
@@ -0,0 +1,76 @@
+"""
+Derived summaries of the company and trade datasets.
+
+Both are nodes of the artifact graph (``utils.pipeline``), rebuilt only
+when their dataset changes:
+
+- ``company_aggregates``: revenue per (year, company, country), behind the
+  company-evolution animation on the companies page;
+- ``trade_summaries``: India's imports, exports and totals per (financial
+  year, partner), behind the top-partners chart on the trade page.
+"""
+import streamlit as st
+
+from utils import pipeline
+from utils.datasets import read_dataset
+
+COMPANIES_ARTIFACT = "company_aggregates"
+TRADE_ARTIFACT = "trade_summaries"
+
+
+def build_company_aggregates():
+    df, _ = read_dataset("companies")
+    by_company = (
+        df.groupby(["Year", "Company", "Country"], as_index=False, observed=True)
+        .agg({
+            "Defense_Revenue_From_A_Year_Ago": "sum",
+            "Total Revenue": "sum",
+            "%of Revenue from Defence": "mean"
+        })
+    )
+    pipeline.save(COMPANIES_ARTIFACT, {"by_company": by_company})
+
+
+def build_trade_summaries():
+    trade_df, _ = read_dataset("trade")
+    trade_summary = trade_df.groupby(['financial_year(start)', 'country'], observed=True).agg({
+        'import': 'sum',
+        'export': 'sum'
+    }).reset_index()
+    trade_summary['country'] = trade_summary['country'].astype(str)
+    trade_summary['total_trade'] = trade_summary['import'] + trade_summary['export']
+    trade_summary['imports_billion'] = trade_summary['import'] / 1000  # Convert to billion USD
+    trade_summary['exports_billion'] = trade_summary['export'] / 1000  # Convert to billion USD
+    trade_summary['total_trade_billion'] = trade_summary['total_trade'] / 1000  # Convert to billion USD
+    trade_summary['trade_balance_billion'] = trade_summary['exports_billion'] - trade_summary['imports_billion']
+    pipeline.save(TRADE_ARTIFACT, {"partners": trade_summary})
+
+
+pipeline.register(COMPANIES_ARTIFACT, build_company_aggregates, deps=["dataset_companies"])
+pipeline.register(TRADE_ARTIFACT, build_trade_summaries, deps=["dataset_trade"])
+
+
+def company_evolution(top_n):
+    """Per-year company revenue rows, limited to each year's ``top_n`` dense ranks."""
+    return _company_evolution(pipeline.fingerprint_of(COMPANIES_ARTIFACT), top_n)
+
+
+@st.cache_data
+def _company_evolution(artifact_fingerprint, top_n):
+    frames, _ = pipeline.load(COMPANIES_ARTIFACT)
+    anim_df = frames["by_company"]
+    anim_df["rank"] = anim_df.groupby("Year")["Defense_Revenue_From_A_Year_Ago"].rank("dense", ascending=False)
+    return anim_df[anim_df["rank"] <= top_n]
+
+
+def trade_partners(year, top_n=6):
+    """India's ``top_n`` partners by total trade in financial year ``year``."""
+    return _trade_partners(pipeline.fingerprint_of(TRADE_ARTIFACT), year, top_n)
+
+
+@st.cache_data
+def _trade_partners(artifact_fingerprint, year, top_n):
+    frames, _ = pipeline.load(TRADE_ARTIFACT)
+    summary = frames["partners"]
+    trade_year = summary[summary['financial_year(start)'] == year].drop(columns='financial_year(start)')
+    return trade_year.sort_values(by='total_trade', ascending=False).head(top_n)
@@ -0,0 +1,150 @@
+"""
+Warm-up job that fills the shared caches before traffic arrives.
+
+Runs every dataset loader, the shared indexes and artifacts, the
+predictions pipeline, the common widget states (every conflict's
+geocoded places, the default trade year) and the companies page's default
+figures (``utils.figures``) in a thread pool, then reports what was warmed
+and how long each step took. Other pages' figures are single cheap
+``px`` calls and are not cached.
+
+Inside the server it runs once per process when ``WARMUP_ON_START=1`` is
+set, started in the background by the first page that loads; in that case
+it fills the in-memory ``st.cache_data``/``st.cache_resource`` entries the
+sessions read. As a CLI it (re)builds the on-disk artifacts and measures
+the cold cost of every step, e.g. as a deploy step::
+
+    python -m utils.warmup --workers 8
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+from utils import datasets, sql
+from utils.assets import load_manifest
+from utils.backtest import load_backtest
+from utils.budget import load_budget_matrix
+from utils.clusters import load_clusters
+from utils.conflicts import coordinates, load_catalogue, reverse_geocode
+from utils.countries import load_country_index
+from utils.event_study import load_event_study
+from utils.figures import company_bubbles, company_count_race, company_revenue_race
+from utils.forecast import forecast
+from utils.power_index import load_strength_matrix
+from utils.predictions import load_predictions
+from utils.profiles import load_profiles
+from utils.similarity import load_similarity_index
+from utils.simulation import load_simulation
+from utils.summaries import company_evolution, trade_partners
+
+logger = get_logger(__name__)
+
+WORKERS = 4
+
+
+def _stages(geocode=True):
+    """
+    Yield the warm-up tasks as ``[(label, fn, args), ...]`` per stage.
+
+    Stages run one after another so derived steps find their inputs cached
+    instead of loading them concurrently with the first stage.
+    """
+    yield [
+        ("country index", load_country_index, ()),
+        ("conflict catalogue", load_catalogue, ()),
+        ("budget matrix", load_budget_matrix, ()),
+        ("asset manifest", load_manifest, ()),
+        ("defence budget", datasets.load_defence_budget, ()),
+        ("military data", datasets.load_military_data, ()),
+        ("2024 strength", datasets.load_strength_2024, ()),
+        ("expenditure workbook", datasets.load_expenditure, ()),
+        ("trade", datasets.load_trade, ()),
+        ("companies", datasets.load_companies, ()),
+        (f"sql tables ({sql.ENGINE})", sql.query, ("SELECT 1",)),
+    ]
+    derived = [
+        ("event study", load_event_study, ()),
+        # Same positional arguments as the Defence Budget page's default view
+        ("budget forecast", forecast, ("budget", "damped", 10, 0.95)),
+        ("country profiles", load_profiles, ()),
+        ("similarity index", load_similarity_index, ()),
+        ("country clusters", load_clusters, ()),
+        ("strength matrix", load_strength_matrix, ()),
+        ("predictions 2047", load_predictions, ()),
+        ("ranking simulation 2047", load_simulation, ()),
+        ("backtest 2047 ranking", load_backtest, ()),
+        ("company evolution", company_evolution, (15,)),
+        # The companies page's default figures (top 10 bars, top 15 bubbles)
+        ("company revenue race", company_revenue_race, (10,)),
+        ("company count race", company_count_race, (10,)),
+        ("company bubbles", company_bubbles, (15,)),
+    ]
+    trade_df, _ = datasets.load_trade()
+    default_year = sorted(trade_df["financial_year(start)"].unique())[0]
+    derived.append((f"trade partners FY {default_year}", trade_partners, (default_year,)))
+    if geocode:
+        catalogue = load_catalogue()
+        places = sorted({point for name in catalogue.names() for point in coordinates(catalogue[name])})
+        derived += [(f"place {lat:.2f},{lon:.2f}", reverse_geocode, (lat, lon)) for lat, lon in places]
+    yield derived
+
+
+def _run(label, fn, args):
+    start = time.perf_counter()
+    try:
+        fn(*args)
+        error = None
+    except Exception as exc:  # report and keep warming the rest
+        error = f"{type(exc).__name__}: {str(exc)[:100]}"
+    return {"task": label, "seconds": time.perf_counter() - start, "error": error}
+
+
+def warm_up(workers=WORKERS, geocode=True):
+    """Run every warm-up task; returns one report row per task."""
+    report = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup") as pool:
+        for stage in _stages(geocode):
+            report += pool.map(lambda task: _run(*task), stage)
+    return report
+
+
+def format_report(report, elapsed):
+    failed = [r for r in report if r["error"]]
+    lines = [f"{r['task']:<34} {r['seconds']:>7.2f}s  {r['error'] or 'ok'}" for r in report]
+    lines.append(f"warmed {len(report) - len(failed)}/{len(report)} tasks in {elapsed:.2f}s")
+    return "\n".join(lines)
+
+
+def _background_warm_up():
+    start = time.perf_counter()
+    report = warm_up()
+    logger.info("cache warm-up finished\n%s", format_report(report, time.perf_counter() - start))
+
+
+@st.cache_resource
+def start_warmup():
+    """Start the background warm-up once per server process if enabled."""
+    if os.environ.get("WARMUP_ON_START") != "1":
+        return None
+    thread = threading.Thread(target=_background_warm_up, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--no-geocode", action="store_true", help="skip reverse-geocoding conflict places")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    report = warm_up(args.workers, geocode=not args.no_geocode)
+    print(format_report(report, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Targeted cache invalidation when files in ``data/`` change.
+
+A background thread watches the data directory (inotify on Linux, stat
+polling elsewhere). When a file changes it works out which artifacts of
+``utils.pipeline`` are downstream of it, rebuilds those, and then clears
+only the Streamlit caches that depend on them (``CACHES``). Editing
+``trade_events_updated2.csv`` rebuilds the trade-events dataset and clears
+``load_trade``; the expenditure and company caches are untouched, and no
+server restart is needed.
+
+The server starts the watcher once per process (set ``WATCH_DATA=0`` to
+disable it). Run by hand it keeps the on-disk artifacts up to date as
+files are edited, or explains what a change would invalidate::
+
+    python -m utils.watcher
+    python -m utils.watcher data/trade_events_updated2.csv
+"""
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+from utils import pipeline
+from utils.paths import DATA_DIR
+
+logger = get_logger(__name__)
+
+DEBOUNCE = 0.5
+POLL_INTERVAL = 2.0
+
+# inotify(7) constants
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_EVENT = struct.Struct("iIII")
+
+
+def _caches():
+    """``{label: (cached function, dependencies)}``; a dependency is an artifact name or a file."""
+    from utils import (
+        backtest, budget, clusters, conflicts, countries, datasets, event_study, figures, forecast,
+        power_index, predictions, profiles, similarity, simulation, sql, summaries,
+    )
+
+    return {
+        "load_defence_budget": (datasets.load_defence_budget, ["dataset_defence_budget"]),
+        "load_military_data": (datasets.load_military_data, ["dataset_military"]),
+        "load_strength_2024": (datasets.load_strength_2024, ["dataset_strength_2024"]),
+        "load_expenditure": (datasets.load_expenditure, ["dataset_expenditure"]),
+        "load_trade": (datasets.load_trade, ["dataset_trade", "dataset_trade_events"]),
+        "load_companies": (datasets.load_companies, ["dataset_companies"]),
+        "company_evolution": (summaries._company_evolution, ["company_aggregates"]),
+        "company_revenue_race": (figures.company_revenue_race, [datasets.COMPANIES_PATH]),
+        "company_count_race": (figures.company_count_race, [datasets.COMPANIES_PATH]),
+        "company_bubbles": (figures.company_bubbles, ["company_aggregates"]),
+        "trade_partners": (summaries._trade_partners, ["trade_summaries"]),
+        "predictions": (predictions._load_predictions, ["predictions"]),
+        "event_study": (event_study._load_event_study, ["event_study"]),
+        "country_profiles": (profiles._load_profiles, ["country_profiles"]),
+        "clusters": (clusters._load_clusters, ["clusters"]),
+        "strength_matrix": (power_index.load_strength_matrix, ["dataset_strength_2024"]),
+        "similarity_index": (similarity.load_similarity_index, ["dataset_military"]),
+        "simulation": (simulation.load_simulation, ["dataset_strength_2024", "dataset_defence_budget"]),
+        "forecast": (forecast.forecast, ["dataset_defence_budget", "dataset_expenditure", countries.INDEX_PATH]),
+        "backtest": (backtest.load_backtest, ["dataset_defence_budget", "dataset_strength_2024"]),
+        "budget_matrix": (budget.load_budget_matrix, [budget.BUDGET_PATH]),
+        "conflict_catalogue": (conflicts.load_catalogue, [conflicts.CONFLICTS_PATH]),
+        "country_index": (countries.load_country_index, [countries.INDEX_PATH]),
+        "sql.top_countries_per_year": (sql.top_countries_per_year, [datasets.COMPANIES_PATH]),
+        "sql.top_companies_by_country": (sql.top_companies_by_country, [datasets.COMPANIES_PATH]),
+        "sql.expenditure_totals": (sql.expenditure_totals, [datasets.EXPENDITURE_PATH]),
+        "sql.duckdb_connection": (sql._duckdb_connection, list(sql.INPUTS)),
+    }
+
+
+CACHES = None
+
+
+def affected(paths):
+    """``(artifacts, cache labels)`` that a change to ``paths`` invalidates."""
+    global CACHES
+    if CACHES is None:
+        CACHES = _caches()
+    changed = {Path(p).resolve() for p in paths}
+    nodes = pipeline.downstream(changed)
+    labels = [
+        label for label, (_, deps) in CACHES.items()
+        if any(dep in nodes if isinstance(dep, str) else Path(dep).resolve() in changed for dep in deps)
+    ]
+    return nodes, labels
+
+
+def invalidate(paths, rebuild=True):
+    """Rebuild the artifacts downstream of ``paths``, then clear the caches reading them."""
+    nodes, labels = affected(paths)
+    if rebuild and nodes:
+        try:
+            pipeline.build(nodes)
+        except Exception:  # e.g. a schema error; pages report it on their next load
+            logger.exception("rebuilding %s failed", ", ".join(nodes))
+    for label in labels:
+        CACHES[label][0].clear()
+    logger.info("data changed (%s): rebuilt %s; cleared %s",
+                ", ".join(Path(p).name for p in paths), ", ".join(nodes) or "-", ", ".join(labels) or "-")
+    return nodes, labels
+
+
+# ─── WATCHING ──────────────────────────────────────────────────────────────────
+def _inotify(directory):
+    """An inotify descriptor watching ``directory``, or None where unavailable."""
+    name = ctypes.util.find_library("c")
+    if name is None:
+        return None
+    libc = ctypes.CDLL(name, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+    if fd < 0:
+        return None
+    mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _read_names(fd):
+    names = set()
+    while True:
+        try:
+            buf = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset < len(buf):
+            _, _, _, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            names.add(buf[offset:offset + length].rstrip(b"\0").decode(errors="replace"))
+            offset += length
+
+
+def _snapshot(directory):
+    out = {}
+    for entry in os.scandir(directory):
+        if entry.is_file():
+            stat = entry.stat()
+            out[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return out
+
+
+class DataWatcher(threading.Thread):
+    """Thread calling ``on_change(paths)`` for each debounced batch of changed files."""
+
+    def __init__(self, directory=DATA_DIR, on_change=invalidate):
+        super().__init__(name="data-watcher", daemon=True)
+        self.directory = Path(directory)
+        self.on_change = on_change
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _notify(self, paths):
+        # Editors' temp and lock files are not inputs of anything
+        paths = sorted(p for p in paths if not Path(p).name.startswith((".", "~")))
+        if paths:
+            try:
+                self.on_change(paths)
+            except Exception:
+                logger.exception("handling data change failed")
+
+    def run(self):
+        fd = _inotify(self.directory)
+        if fd is None:
+            self._poll()
+            return
+        try:
+            while not self.stopped.is_set():
+                if not select.select([fd], [], [], 1.0)[0]:
+                    continue
+                names = _read_names(fd)
+                # Saves arrive as bursts (truncate, write, close, rename)
+                while select.select([fd], [], [], DEBOUNCE)[0]:
+                    names |= _read_names(fd)
+                self._notify(str(self.directory / name) for name in names if name)
+        finally:
+            os.close(fd)
+
+    def _poll(self):
+        before = _snapshot(self.directory)
+        while not self.stopped.wait(POLL_INTERVAL):
+            after = _snapshot(self.directory)
+            changed = {p for p in before.keys() | after.keys() if before.get(p) != after.get(p)}
+            before = after
+            self._notify(changed)
+
+
+@st.cache_resource
+def start_watcher():
+    """Start watching ``data/`` once per server process unless ``WATCH_DATA=0``."""
+    if os.environ.get("WATCH_DATA") == "0":
+        return None
+    watcher = DataWatcher()
+    watcher.start()
+    return watcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("paths", nargs="*", help="explain what a change to these files invalidates")
+    args = parser.parse_args()
+    if args.paths:
+        nodes, labels = affected(args.paths)
+        print(f"artifacts: {', '.join(nodes) or '-'}")
+        print(f"caches:    {', '.join(labels) or '-'}")
+        return
+
+    def report(paths):
+        start = time.perf_counter()
+        nodes, _ = invalidate(paths)
+        print(f"{', '.join(Path(p).name for p in paths)} -> rebuilt {', '.join(nodes) or '-'} "
+              f"in {time.perf_counter() - start:.2f}s")
+
+    watcher = DataWatcher(on_change=report)
+    print(f"watching {DATA_DIR} (Ctrl+C to stop)")
+    watcher.start()
+    try:
+        while watcher.is_alive():
+            watcher.join(1.0)
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()